@@ -14,9 +14,12 @@
 
 import logging
 import os
+import threading
 import traceback
 from typing import Any, Dict, Iterable, List, Mapping, Tuple, Union
 
+from cachetools import TTLCache, cached
+from google.oauth2 import credentials as oauth
 from googleapiclient.discovery import Resource
 from googleapiclient.errors import HttpError
 from service_framework import service_builder
@@ -30,6 +33,94 @@ from classes.exceptions import CredentialsError
 from classes.report_config import ReportConfig
 
 
+class RefreshedCredentials(Credentials):
+  """Credentials that keep their OAuth credentials until they expire.
+
+  The base class rebuilds the OAuth credentials from the token it first
+  loaded on every access. Once that token expires, each later access would
+  refresh it and store it back in the datastore again.
+  """
+  _oauth: oauth.Credentials = None
+
+  @property
+  def credentials(self) -> oauth.Credentials:
+    """The OAuth credentials, refreshed only when they are no longer valid."""
+    if self._oauth is None or not self._oauth.valid:
+      self._oauth = super().credentials
+    return self._oauth
+
+
+@cached(cache=TTLCache(maxsize=32, ttl=55 * 60), lock=threading.Lock())
+def cached_credentials(email: str, project: str) -> Credentials:
+  """Fetches the credentials for a user, reusing any recently loaded.
+
+  Loading the credentials means a round-trip to the datastore for both the
+  project's client secrets and the user's token, so they are held for 55
+  minutes - just under the lifetime of an access token.
+
+  Args:
+      email (str): the user's email.
+      project (str): the GCP project.
+
+  Returns:
+      Credentials: the credentials
+  """
+  return RefreshedCredentials(datastore=SecretManager, email=email,
+                              project=project)
+
+
+# the API services built by each thread; an httplib2 connection cannot be
+# shared between threads.
+_thread_services = threading.local()
+
+
+def cached_service(service: services.Service,
+                   credentials: Credentials) -> Resource:
+  """Builds an API service for the current thread, reusing any already built.
+
+  Building a service parses the API's discovery document, so fetchers for the
+  same product and user share one per thread rather than each building their
+  own. Services are held for as long as the credentials they were built from.
+
+  Args:
+      service (services.Service): the API.
+      credentials (Credentials): the user's credentials.
+
+  Returns:
+      Resource: the service definition
+  """
+  if (cache := getattr(_thread_services, 'cache', None)) is None:
+    cache = _thread_services.cache = TTLCache(maxsize=32, ttl=55 * 60)
+
+  if (resource := cache.get((service, credentials))) is None:
+    resource = cache[(service, credentials)] = service_builder.build_service(
+        service=service, key=credentials.credentials)
+
+  return resource
+
+
+def get_chunk_multiplier(default: int = 64) -> int:
+  """Reads the streaming chunk size, in MiB, from the environment.
+
+  The value comes from 'CHUNK_MULTIPLIER'. GCS resumable uploads pay a
+  request per chunk, so throughput drops badly with small chunks; anything
+  under 8 (MiB) is raised to 8.
+
+  Args:
+      default (int): the size to use if none is set. Defaults to 64.
+
+  Returns:
+      int: the chunk size in MiB.
+  """
+  multiplier = int(os.environ.get('CHUNK_MULTIPLIER', default))
+  if multiplier < 8:
+    logging.warning('CHUNK_MULTIPLIER of %s is too small; using 8.',
+                    multiplier)
+    multiplier = 8
+
+  return multiplier
+
+
 class Fetcher(object):
   @decorators.retry(exceptions=HttpError, tries=3, backoff=2)
   def fetch(self, method, **kwargs: Mapping[str, str]) -> Dict[str, Any]:
@@ -58,24 +149,30 @@ class ReportFetcher(object):
   report_type: report_type.Type
   service_definition: services.Service
 
-  chunk_multiplier = int(os.environ.get('CHUNK_MULTIPLIER', 64))
+  chunk_multiplier = get_chunk_multiplier()
+  # the most downloaded chunks waiting for the uploader at once; this bounds
+  # memory use when the upload to GCS is slower than the download.
+  upload_queue_size = int(os.environ.get('UPLOAD_QUEUE_SIZE', 4))
   email = None
   project = None
   profile = None
 
+  @property
+  def credentials(self) -> Credentials:
+    """The user's credentials."""
+    return cached_credentials(email=self.email, project=self.project)
+
   @property
   def service(self) -> Resource:
     """Creates the API service for the product.
 
+    The service makes its calls through an httplib2 connection, which cannot
+    be shared between threads, so each thread builds and keeps its own.
+
     Returns:
         Resource: the service definition
     """
-    return service_builder.build_service(
-        service=self.report_type.service,
-        key=Credentials(datastore=SecretManager,
-                        email=self.email,
-                        project=self.project).credentials
-    )
+    return cached_service(self.report_type.service, self.credentials)
 
   def read_header(self, report_details: ReportConfig) -> Tuple[List[str],
                                                                List[str]]:
@@ -12,8 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from copy import deepcopy
+import threading
 import unittest
 
+from unittest import mock
+
+import classes
 from classes import strip_nulls
 
 
@@ -46,3 +50,76 @@ class InitTest(unittest.TestCase):
 
   def test_strip_nulls_none(self):
     self.assertEqual(None, strip_nulls(None))
+
+  @mock.patch.object(classes, 'RefreshedCredentials', autospec=True)
+  def test_cached_credentials_reused(self, mock_credentials):
+    classes.cached_credentials.cache_clear()
+    first = classes.cached_credentials(email='a@b.com', project='p')
+    second = classes.cached_credentials(email='a@b.com', project='p')
+    other = classes.cached_credentials(email='c@d.com', project='p')
+
+    self.assertIs(first, second)
+    self.assertEqual(2, mock_credentials.call_count)
+    self.assertIsNotNone(other)
+
+  @mock.patch.object(classes.Credentials, 'credentials',
+                     new_callable=mock.PropertyMock)
+  def test_refreshed_credentials_kept_until_expired(self, mock_oauth):
+    token = mock.Mock(valid=True)
+    mock_oauth.return_value = token
+    credentials = classes.RefreshedCredentials(datastore=mock.Mock(),
+                                               email='a@b.com', project='p')
+
+    self.assertIs(token, credentials.credentials)
+    self.assertIs(token, credentials.credentials)
+    mock_oauth.assert_called_once()
+
+    token.valid = False
+    mock_oauth.return_value = mock.Mock(valid=True)
+    self.assertIs(mock_oauth.return_value, credentials.credentials)
+    self.assertEqual(2, mock_oauth.call_count)
+
+  @mock.patch.object(classes.service_builder, 'build_service', autospec=True)
+  @mock.patch.object(classes.ReportFetcher, 'credentials',
+                     new_callable=mock.PropertyMock)
+  def test_service_per_thread(self, unused_credentials, mock_build):
+    mock_build.side_effect = lambda **unused: mock.Mock()
+    fetcher = classes.ReportFetcher()
+    fetcher.report_type = mock.Mock()
+
+    service = fetcher.service
+    self.assertIs(service, fetcher.service)
+
+    services = []
+    thread = threading.Thread(target=lambda: services.append(fetcher.service))
+    thread.start()
+    thread.join()
+    self.assertIsNot(service, services[0])
+    self.assertEqual(2, mock_build.call_count)
+
+  @mock.patch.object(classes.service_builder, 'build_service', autospec=True)
+  @mock.patch.object(classes.ReportFetcher, 'credentials',
+                     new_callable=mock.PropertyMock)
+  def test_service_shared_between_fetchers(self, mock_credentials,
+                                           mock_build):
+    mock_build.side_effect = lambda **unused: mock.Mock()
+    product = mock.Mock()
+    first, second, other = \
+        classes.ReportFetcher(), classes.ReportFetcher(), \
+        classes.ReportFetcher()
+    for fetcher in (first, second, other):
+      fetcher.report_type = mock.Mock(service=product)
+
+    service = first.service
+    self.assertIs(service, second.service)
+    mock_credentials.return_value = mock.Mock()
+    self.assertIsNot(service, other.service)
+    self.assertEqual(2, mock_build.call_count)
+
+  @mock.patch.dict(classes.os.environ, {'CHUNK_MULTIPLIER': '2'})
+  def test_get_chunk_multiplier_minimum(self):
+    self.assertEqual(8, classes.get_chunk_multiplier())
+
+  @mock.patch.dict(classes.os.environ, {}, clear=True)
+  def test_get_chunk_multiplier_default(self):
+    self.assertEqual(128, classes.get_chunk_multiplier(default=128))
@@ -13,9 +13,11 @@
 # limitations under the License.
 
 import logging
+import threading
 from typing import Any, Dict
 
 from auth.credentials import Credentials
+from cachetools import LRUCache, cached
 from google.cloud import storage
 from google.cloud.storage import Bucket
 
@@ -40,7 +42,20 @@ class Cloud_Storage(object):
     self.project = project
 
   @staticmethod
+  @cached(cache=LRUCache(maxsize=8), lock=threading.Lock())
   def client(credentials: Credentials = None) -> storage.Client:
+    """Fetches a storage client for the credentials.
+
+    Clients are kept and shared, so the connection pool and auth setup of one
+    is reused by every later upload made with the same credentials.
+
+    Args:
+        credentials (Credentials, optional): the credentials to use. Defaults
+          to the project's default credentials.
+
+    Returns:
+        storage.Client: the client.
+    """
     return storage.Client(
         credentials=(credentials.credentials if credentials else None))
 
@@ -60,8 +75,7 @@ class Cloud_Storage(object):
         bucket_name (str):  destination bucket name
         report (Dict[str, Any]):  report definition
     """
-    client = storage.Client(
-        credentials=(credentials.credentials if credentials else None))
+    client = Cloud_Storage.client(credentials=credentials)
 
     path_segments = report['current_path'].split('/')
     report_bucket = path_segments[-2]
@@ -94,8 +108,7 @@ class Cloud_Storage(object):
         destination (str):  new name
         credentials (Credentials):  authentication, if needed
     """
-    client = storage.Client(
-        credentials=(credentials.credentials if credentials else None))
+    client = Cloud_Storage.client(credentials=credentials)
 
     source_bucket = Bucket(client, name=bucket)
     source_blob = source_bucket.blob(blob_name=source)
@@ -119,13 +132,14 @@ class Cloud_Storage(object):
     Returns:
       (str):  file content
     """
-    client = storage.Client(
-        credentials=(credentials.credentials if credentials else None))
+    client = Cloud_Storage.client(credentials=credentials)
 
     # logging.info('Fetching {f} from GCS'.format(f=file))
 
+    # These are small files, read in a single request; `bucket()` rather than
+    # `get_bucket()` skips the round trip fetching the bucket's metadata.
     try:
-      content = client.get_bucket(bucket).blob(file).download_as_string()
+      content = client.bucket(bucket).blob(file).download_as_bytes()
     except Exception as ex:
       content = None
       logging.error('Error fetching file {f}\n{e}'.format(f=file, e=ex))
@@ -135,8 +149,7 @@ class Cloud_Storage(object):
   @staticmethod
   def write_file(bucket: str, file: str, data: bytes,
                  credentials: Credentials = None) -> None:
-    client = storage.Client(
-        credentials=(credentials.credentials if credentials else None))
+    client = Cloud_Storage.client(credentials=credentials)
 
     # logging.info(f'Writing {file} to GCS: {len(data)}')
 
@@ -149,18 +162,14 @@ class Cloud_Storage(object):
   @staticmethod
   def read_first_line(report: dict, chunk: int = 4096,
                       credentials: Credentials = None) -> str:
-    client = storage.Client(
-        credentials=(credentials.credentials if credentials else None))
-
-    header = client.read_chunk(
+    header = Cloud_Storage.read_chunk(
         report, chunk, credentials=credentials).split('\n')[0]
     return header
 
   @staticmethod
   def read_chunk(report: dict, chunk: int = 4096,
                  credentials: Credentials = None, start: int = 0) -> str:
-    client = storage.Client(
-        credentials=(credentials.credentials if credentials else None))
+    client = Cloud_Storage.client(credentials=credentials)
 
     path_segments = report['current_path'].split('/')
     report_bucket = path_segments[-2]
@@ -189,8 +198,7 @@ class Cloud_Storage(object):
     Returns:
         str: [description]
     """
-    client = storage.Client(
-        credentials=(credentials.credentials if credentials else None))
+    client = Cloud_Storage.client(credentials=credentials)
 
     path_segments = report['current_path'].split('/')
     report_bucket = path_segments[-2]
@@ -0,0 +1,67 @@
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from unittest import mock
+
+from classes import cloud_storage
+from classes.cloud_storage import Cloud_Storage
+
+
+class CloudStorageTest(unittest.TestCase):
+
+  def setUp(self):
+    Cloud_Storage.client.cache_clear()
+
+  @mock.patch.object(cloud_storage.storage, 'Client', autospec=True)
+  def test_client_reused(self, mock_client):
+    mock_client.side_effect = lambda credentials: mock.Mock()
+    creds = mock.Mock()
+
+    client = Cloud_Storage.client(credentials=creds)
+    self.assertIs(client, Cloud_Storage.client(credentials=creds))
+    mock_client.assert_called_once_with(credentials=creds.credentials)
+
+    self.assertIsNot(client, Cloud_Storage.client(credentials=mock.Mock()))
+
+  @mock.patch.object(cloud_storage.storage, 'Client', autospec=True)
+  def test_fetch_file(self, mock_client):
+    blob = mock_client.return_value.bucket.return_value.blob
+    blob.return_value.download_as_bytes.return_value = b'foo'
+
+    self.assertEqual(b'foo', Cloud_Storage.fetch_file('bucket', 'file'))
+    mock_client.return_value.bucket.assert_called_once_with('bucket')
+    blob.assert_called_once_with('file')
+    mock_client.return_value.get_bucket.assert_not_called()
+
+  @mock.patch.object(cloud_storage.storage, 'Client', autospec=True)
+  def test_fetch_file_reuses_client(self, mock_client):
+    Cloud_Storage.fetch_file('bucket', 'file')
+    Cloud_Storage.write_file('bucket', 'file', b'foo')
+    Cloud_Storage.fetch_file('bucket', 'file')
+
+    mock_client.assert_called_once_with(credentials=None)
+
+  @mock.patch.object(cloud_storage, 'Bucket', autospec=True)
+  @mock.patch.object(cloud_storage.storage, 'Client', autospec=True)
+  def test_read_first_line(self, unused_client, mock_bucket):
+    mock_bucket.return_value.blob.return_value.download_as_string.\
+        return_value = b'Date,Campaign\n2022-01-01,Foo'
+
+    self.assertEqual('Date,Campaign', Cloud_Storage.read_first_line(
+        {'current_path': 'gs://bucket/report.csv'}))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -13,14 +13,32 @@
 # limitations under the License.
 
 import io
-import re
-from typing import Dict, List, Tuple
+import string
+from typing import Dict, List, Tuple, Union
 
-import pandas
-from pandas.errors import EmptyDataError
 
+class _SanitizeTable(dict):
+  """Translation table for `sanitize_string`.
 
-def get_column_types(data: io.BytesIO) -> Tuple[List[str], List[str]]:
+  Letters, digits and '_' are kept and ' ():,-' become '_'. Anything else is
+  replaced by its hex code point, which is added to the table the first time
+  the character is seen.
+  """
+
+  def __missing__(self, key: int) -> str:
+    self[key] = hex(key)
+    return self[key]
+
+
+_SANITIZE_TABLE = _SanitizeTable({
+    **{ord(c): c for c in string.ascii_letters + string.digits + '_'},
+    **{ord(c): '_' for c in ' ():,-'},
+})
+
+
+def get_column_types(
+        data: Union[bytes, io.BytesIO],
+        infer_types: bool = True) -> Tuple[List[str], List[str]]:
   """derive the column types
 
   Using messytables' CSV API, attempt to derive the column types based on a
@@ -29,13 +47,22 @@ def get_column_types(data: io.BytesIO) -> Tuple[List[str], List[str]]:
   This is still a WIP due to the parlous state of the DV360/CM CSV data formats
   in general
 
+  pandas is imported here rather than at module level as most users of this
+  module only want the string sanitizers, and pandas is by far the heaviest
+  import in a Cloud Function cold start.
+
   Arguments:
-      data (io.BytesIO):  sample of the CSV file
+      data (Union[bytes, io.BytesIO]):  sample of the CSV file
+      infer_types (bool):  infer the column types; if False only the header is
+                           parsed and every column is a 'STRING'
 
   Returns:
       (List[str], List[str]): tuple of list of header names and list of
                                 column types
   """
+  import pandas
+  from pandas.errors import EmptyDataError
+
   def _sql_field(T):
     R = None
     match T.dtype.name.upper():
@@ -58,11 +85,17 @@ def get_column_types(data: io.BytesIO) -> Tuple[List[str], List[str]]:
 
     return R or 'STRING'
 
+  if isinstance(data, (bytes, bytearray, memoryview)):
+    data = io.BytesIO(data)
+
   try:
-    initial_df = pandas.read_csv(data)
+    initial_df = pandas.read_csv(data, nrows=None if infer_types else 0)
     csv_headers = list(initial_df.columns)
 
-    if initial_df.empty:
+    if not infer_types:
+      csv_types = ['STRING'] * len(csv_headers)
+
+    elif initial_df.empty:
       csv_types = []
 
     else:
@@ -97,20 +130,10 @@ def sanitize_string(original: str, for_column: bool = False) -> str:
 
   Returns:
       str: sanitized string
-
-  re.sub('[^a-zA-Z0-9,]', '_', original)
   """
-  sanitized = ''
-
-  for char in original:
-    if re.match('[a-zA-Z0-9_]', char):
-      sanitized += char
-    elif re.match('[ ():,-]', char):
-      sanitized += '_'
-    else:
-      sanitized += hex(ord(char))
+  sanitized = str.translate(original, _SANITIZE_TABLE)
 
-  if for_column and sanitized.startswith(tuple([c for c in '0123456789'])):
+  if for_column and sanitized[:1].isdigit():
     sanitized = 'X' + sanitized
 
   return sanitized
@@ -53,6 +53,11 @@ class CSVHelpersTest(unittest.TestCase):
                      csv_helpers.sanitize_column(
                          '*Sales Confirm - Revenue - DDA'))
 
+  def test_sanitize_string_non_ascii(self):
+    self.assertEqual('Caf0xe9_0xe9t0xe9',
+                     csv_helpers.sanitize_title('Café été'))
+    self.assertEqual('X1st_0x2603', csv_helpers.sanitize_column('1st ☃'))
+
   def test_sanitize_string_invalid(self):
     with self.assertRaises(TypeError):
       csv_helpers.sanitize_title(None)
@@ -63,6 +68,17 @@ class CSVHelpersTest(unittest.TestCase):
     self.assertEqual(HEADER, csv_header)
     self.assertEqual(TYPES, csv_types)
 
+  def test_get_column_types_from_bytes(self):
+    csv_header, csv_types = csv_helpers.get_column_types(CSV.encode('utf-8'))
+    self.assertEqual(HEADER, csv_header)
+    self.assertEqual(TYPES, csv_types)
+
+  def test_get_column_types_header_only(self):
+    csv_header, csv_types = csv_helpers.get_column_types(
+        CSV.encode('utf-8'), infer_types=False)
+    self.assertEqual(HEADER, csv_header)
+    self.assertEqual(['STRING'] * len(HEADER), csv_types)
+
   def test_create_table_schema(self):
     schema = csv_helpers.create_table_schema(HEADER, TYPES)
     self.assertEqual([
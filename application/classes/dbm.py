@@ -13,30 +13,79 @@
 # limitations under the License.
 from __future__ import annotations
 
-import datetime
-import io
+import collections
+import itertools
 import logging
-from contextlib import closing
+import os
+import time
+from concurrent import futures
+from http import HTTPStatus
 from queue import Queue
-from typing import Any, Dict, List, Mapping, Tuple, Union
-from urllib.request import urlopen
+from typing import Any, Dict, Iterator, List, Mapping, Tuple, Union
 
-from auth import credentials
+import requests
+from cachetools import TTLCache
+from google.auth.exceptions import TransportError
 from googleapiclient.errors import HttpError
-from service_framework.services import Service
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from classes import Fetcher, ReportFetcher, csv_helpers, decorators
 from classes.cloud_storage import Cloud_Storage
 from classes.gcs_streaming import ThreadedGCSObjectStreamUpload
-from classes.gmail import error_to_trace
 from classes.report_config import ReportConfig
 from classes.report_type import Type
 
+# DV360 reports are downloaded from signed GCS urls; one pooled session means
+# the connections are kept alive between the header read and the download,
+# and across reports.
+_SESSION = requests.Session()
+_SESSION.mount('https://',
+               HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                           max_retries=Retry(total=5, backoff_factor=1,
+                                             status_forcelist=[500, 502, 503,
+                                                               504])))
+
+# The DV360 report footer follows the data after a blank line, and lists one
+# 'Group By:' line per leading (empty) column of the totals row above it.
+_FOOTER_DELIMITER = b'\n\n'
+_FOOTER_GROUP_BY = b'\nGroup By:'
+
+# Errors worth retrying a DV360 API call for. Anything else (such as a failed
+# credential refresh) will fail the same way again, so is raised at once.
+_RETRYABLE_ERRORS = (HttpError, TransportError, ConnectionError, TimeoutError)
+
+
+def _is_transient(error: Exception) -> bool:
+  """Whether a retryable error is worth retrying.
+
+  Of the API errors, only rate limiting (429) and server errors (5xx) are;
+  a bad request, auth failure or missing report fails the same way again.
+
+  Args:
+    error: the exception raised.
+
+  Returns:
+    bool: True if the call should be retried.
+  """
+  if isinstance(error, HttpError):
+    status = int(error.resp.status)
+    return status == HTTPStatus.TOO_MANY_REQUESTS or status >= 500
+  return True
+
 
 class DBM(ReportFetcher, Fetcher):
   report_type = Type.DV360
   service_definition = Type.DV360.service
 
+  download_workers = int(os.environ.get('DOWNLOAD_WORKERS', 4))
+  # the amount of the report read to find the columns and their types.
+  header_sample_size = 64 * 1024
+  # reports up to this size are uploaded in one go, without a streamer thread.
+  small_report_size = 32 * 1024 * 1024
+
+  _header_prefix: Tuple[str, bytes] = None
+
   def __init__(self, email: str, project: str, profile: str = None) -> DBM:
     self.email = email
     self.project = project
@@ -75,20 +124,28 @@ class DBM(ReportFetcher, Fetcher):
             filter(lambda item: 'finishTimeMs' in
                    item.get('metadata', {}).get('status', {}),
                    all_results['reports'])
-        ordered = \
-            sorted(results,
-                   key=lambda k: int(k['metadata']['status']['finishTimeMs']))
-        report = ordered[-1]
+        report = max(
+            results,
+            key=lambda k: int(k['metadata']['status']['finishTimeMs']),
+            default={})
       else:
         logging.info('No reports - has this report run successfully yet?')
 
     return report
 
+  @decorators.lazy_property
+  def _queries(self) -> TTLCache:
+    """Query definitions fetched in the last minute, by report id."""
+    return TTLCache(maxsize=128, ttl=60)
+
   def get_report_definition(self,
                             report_id: int,
                             fields: str = None) -> Mapping[str, Any]:
     """Fetch a complete report definition
 
+    Definitions are kept for a minute, so the several lookups made for a
+    report during one run cost a single API call.
+
     Args:
         report_id (int): the report id.
         fields (str, optional): Unsupported in DV360.
@@ -96,9 +153,10 @@ class DBM(ReportFetcher, Fetcher):
     Returns:
         Mapping[str, Any]: [description]
     """
-    report = self.fetch(
-        method=self.service.queries().get,
-        **{'queryId': report_id})
+    if (report := self._queries.get(str(report_id))) is None:
+      report = self._queries[str(report_id)] = self.fetch(
+          method=self.service.queries().get,
+          **{'queryId': report_id})
 
     return report
 
@@ -136,34 +194,28 @@ class DBM(ReportFetcher, Fetcher):
     Returns:
       result (Dict): the normalized data structure
     """
-    query_object = \
-        self.service.queries().get(queryId=report_id).execute()
-
-    # Check if report has ever completed a run
-    try:
-      gcs_path = \
-          query_object['metadata']['googleCloudStoragePathForLatestReport']
-      latest_runtime = query_object['metadata']['latestReportRunTimeMs']
-    except KeyError:
-      gcs_path = ''
-      latest_runtime = 0
+    query_object = self.get_report_definition(report_id)
+    metadata = query_object['metadata']
+    # A report that has never completed a run has no file or run time.
+    gcs_path = metadata.get('googleCloudStoragePathForLatestReport', '')
+    latest_runtime = metadata.get('latestReportRunTimeMs', 0)
 
     report_data = {
         'id': query_object['queryId'],
-        'name': query_object['metadata']['title'],
-        'report_name':
-        csv_helpers.sanitize_title(query_object['metadata']['title']),
+        'name': metadata['title'],
+        'report_name': csv_helpers.sanitize_title(metadata['title']),
         'type': query_object['params']['type'],
         'current_path': gcs_path,
         'last_updated':
-        datetime.datetime.fromtimestamp(
-            float(latest_runtime) / 1000.0).strftime("%Y%m%d%H%M"),
+        time.strftime('%Y%m%d%H%M',
+                      time.localtime(int(latest_runtime) // 1000)),
         'update_cadence': query_object.get('schedule', {}).get('frequency'),
     }
 
     return report_data
 
-  @decorators.retry(Exception, tries=3, delay=15, backoff=2)
+  @decorators.retry(_RETRYABLE_ERRORS, tries=3, delay=15, backoff=2,
+                    retryable=_is_transient)
   def run_report(self, report_id: int,
                  asynchronous: bool = True) -> Dict[str, Any]:
     """Runs a report on the product.
@@ -187,16 +239,16 @@ class DBM(ReportFetcher, Fetcher):
 
     return result
 
-  @decorators.retry(Exception, tries=3, delay=15, backoff=2)
+  @decorators.retry(_RETRYABLE_ERRORS, tries=3, delay=15, backoff=2,
+                    retryable=_is_transient)
   def report_state(self, report_id: int) -> str:
     request = self.service.queries().reports().list(queryId=report_id)
     results = request.execute()
 
     if reports := results.get('reports'):
-      ordered = \
-          sorted(reports,
-                 key=lambda k: int(k['metadata']['reportDataStartTimeMs']))
-      return ordered[-1]['metadata']['status']['state']
+      latest = max(reports,
+                   key=lambda k: int(k['metadata']['reportDataStartTimeMs']))
+      return latest['metadata']['status']['state']
 
     else:
       return 'UNKNOWN'
@@ -206,6 +258,9 @@ class DBM(ReportFetcher, Fetcher):
                                                          List[str]]:
     """Reads the header of the report CSV file.
 
+    Only the first `header_sample_size` bytes are fetched; these are kept so
+    that `stream_to_gcs` does not have to download them a second time.
+
     Args:
         report_details (dict): the report definition
 
@@ -213,14 +268,148 @@ class DBM(ReportFetcher, Fetcher):
         Tuple[List[str], List[str]]: the csv headers and column types
     """
     if path := report_details.current_path:
-      with closing(urlopen(path)) as report:
-        data = report.read(self.chunk_multiplier * 1024 * 1024)
-        bytes_io = io.BytesIO(data)
-      return csv_helpers.get_column_types(bytes_io)
+      with _SESSION.get(
+              path, headers={'Range': f'bytes=0-{self.header_sample_size - 1}'},
+              stream=True) as report:
+        report.raise_for_status()
+        data = next(report.iter_content(self.header_sample_size), b'')
+      self._header_prefix = (path, data)
+
+      # only infer the types from complete rows.
+      last_row_end = data.rfind(b'\n') + 1
+      return csv_helpers.get_column_types(
+          memoryview(data)[:last_row_end] if last_row_end else data)
 
     else:
       return (None, None)
 
+  def _download(self, path: str, chunk_size: int) -> Iterator[bytes]:
+    """Downloads the report CSV in chunks.
+
+    The first chunk is requested on its own to find the size of the file, and
+    the remainder is then fetched as parallel ranged requests. If
+    `read_header` has already fetched the start of this file, that is
+    returned as the first chunk and only the rest of the file is requested.
+
+    Args:
+        path (str): the report's GCS url.
+        chunk_size (int): the size of each chunk to read.
+
+    Yields:
+        bytes: the next chunk of the file.
+    """
+    prefix = b''
+    if self._header_prefix and self._header_prefix[0] == path:
+      prefix = self._header_prefix[1]
+    self._header_prefix = None
+
+    offset = len(prefix)
+    with _SESSION.get(
+            path, headers={'Range': f'bytes={offset}-{offset + chunk_size - 1}'},
+            stream=True) as _report:
+      if _report.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+        # The header read was the whole file.
+        logging.info('Report is %s bytes', f'{offset:,}')
+        if prefix:
+          yield prefix
+        return
+
+      _report.raise_for_status()
+      if _report.status_code != HTTPStatus.PARTIAL_CONTENT:
+        # Range ignored, so this is the whole file; stream it as is. A chunked
+        # response has no content-length, so the size may not be known.
+        if size := _report.headers.get('content-length'):
+          logging.info('Report is %s bytes', f'{int(size):,}')
+        else:
+          logging.info('Report size unknown, streaming it whole')
+        yield from _report.iter_content(chunk_size)
+        return
+
+      _report_size = \
+          int(_report.headers['content-range'].rpartition('/')[2])
+      logging.info('Report is %s bytes', f'{_report_size:,}')
+      first = _report.content
+
+    if prefix:
+      yield prefix
+    yield first
+    yield from self._download_ranges(path=path,
+                                     start=offset + len(first),
+                                     end=_report_size,
+                                     chunk_size=chunk_size)
+
+  def _download_ranges(self, path: str, start: int, end: int,
+                       chunk_size: int) -> Iterator[bytes]:
+    """Downloads a section of the report with parallel ranged requests.
+
+    At most `download_workers` chunks are in flight (and so held in memory)
+    at once, and they are returned in file order.
+
+    Args:
+        path (str): the report's GCS url.
+        start (int): the first byte to fetch.
+        end (int): the end of the section (exclusive).
+        chunk_size (int): the size of each ranged request.
+
+    Yields:
+        bytes: the next chunk of the file.
+    """
+    def _fetch(first: int) -> bytes:
+      last = min(first + chunk_size, end) - 1
+      response = _SESSION.get(path, headers={'Range': f'bytes={first}-{last}'})
+      response.raise_for_status()
+      return response.content
+
+    with futures.ThreadPoolExecutor(
+            max_workers=self.download_workers) as executor:
+      pending = collections.deque()
+      for first in range(start, end, chunk_size):
+        pending.append(executor.submit(_fetch, first))
+        if len(pending) == self.download_workers:
+          yield pending.popleft().result()
+
+      while pending:
+        yield pending.popleft().result()
+
+  def _trim_footer(self, chunk: bytes) -> Union[bytes, memoryview]:
+    """Trims the footer from the last chunk of the report.
+
+    The footer starts at the last blank line, and is preceded by a totals row
+    of one leading comma per 'Group By:' line in the footer.
+    NOTE: if no blank line (partial file?) NO TRIMMING WILL HAPPEN
+    THIS SHOULD NEVER BE THE CASE
+
+    Args:
+        chunk (bytes): the last chunk of the report.
+
+    Returns:
+        Union[bytes, memoryview]: the chunk without the footer, as a view on
+          the original so the (possibly very large) chunk is not copied.
+    """
+    # find the footer
+    blank_line_pos = chunk.rfind(_FOOTER_DELIMITER)
+
+    # if we don't find it, there's no footer.
+    if blank_line_pos == -1:
+      logging.info(('No footer delimiter found. Writing entire '
+                    'final chunk as is.'))
+      return chunk
+
+    # count the footer's 'Group By:' lines; every footer line follows a
+    # newline, as the footer starts at one.
+    group_count = chunk.count(_FOOTER_GROUP_BY, blank_line_pos)
+
+    # the totals row can only be the line immediately before the footer, so
+    # look there rather than searching back through the whole chunk.
+    total_block_start = chunk.rfind(b'\n', 0, blank_line_pos)
+    row_start = total_block_start + 1
+    if group_count and \
+            chunk.count(b',', row_start, row_start + group_count) == group_count:
+      return memoryview(chunk)[:max(total_block_start, 0)]
+
+    else:
+      return memoryview(chunk)[:blank_line_pos]
+
   @decorators.measure_memory
   def stream_to_gcs(self, bucket: str, report_details: ReportConfig) -> None:
     """Streams the report CSV to Cloud Storage.
@@ -232,66 +421,48 @@ class DBM(ReportFetcher, Fetcher):
     if not report_details.current_path:
       return
 
-    queue = Queue()
-
     report_id = report_details.id
     chunk_size = self.chunk_multiplier * 1024 * 1024
-    out_file = io.BytesIO()
+    chunks = self._download(report_details.current_path, chunk_size)
+
+    # Read up to `small_report_size` bytes; if that is the whole report, it
+    # is written in a single upload rather than through the threaded streamer.
+    head = []
+    head_size = 0
+    for chunk in chunks:
+      head.append(chunk)
+      head_size += len(chunk)
+      if head_size > self.small_report_size:
+        break
 
+    else:
+      Cloud_Storage.client(credentials=self.credentials).bucket(bucket).blob(
+          f'{report_id}.csv').upload_from_string(
+              bytes(self._trim_footer(b''.join(head))))
+      logging.info('Report written in one upload: %s bytes', f'{head_size:,}')
+      return
+
+    queue = Queue(maxsize=self.upload_queue_size)
     streamer = \
         ThreadedGCSObjectStreamUpload(
-            client=Cloud_Storage.client(),
-            creds=credentials.Credentials(
-                email=self.email, project=self.project).credentials,
+            client=Cloud_Storage.client(credentials=self.credentials),
+            creds=self.credentials.credentials,
             bucket_name=bucket,
             blob_name=f'{report_id}.csv',
             chunk_size=chunk_size,
             streamer_queue=queue)
     streamer.start()
 
-    with closing(urlopen(report_details.current_path)) as _report:
-      _downloaded = 0
-      chunk_id = 1
-      _report_size = int(_report.headers['content-length'])
-      logging.info('Report is %s bytes', f'{_report_size:,}')
-      while _downloaded < _report_size:
-        chunk = _report.read(chunk_size)
-        _downloaded += len(chunk)
-        if _downloaded >= _report_size:
-          # last chunk... trim to footer if there is one, or last blank line if not
-          # NOTE: if no blank line (partial file?) NO TRIMMING WILL HAPPEN
-          # THIS SHOULD NEVER BE THE CASE
-          last = io.BytesIO(chunk)
-
-          # find the footer
-          blank_line_pos = chunk.rfind(b'\n\n')
-
-          # if we don't find it, there's no footer.
-          if blank_line_pos == -1:
-            logging.info(('No footer delimiter found. Writing entire '
-                          'final chunk as is.'))
-            queue.put(chunk)
-
-          else:
-            # read the footer
-            last.seek(blank_line_pos)
-            footer = last.readlines()
-            group_count = sum(g.startswith(b'Group By:') for g in footer)
-            total_block_start = chunk.rfind(b'\n' + b',' * group_count)
-
-            if total_block_start == -1:
-              last.truncate(blank_line_pos)
-
-            else:
-              last.truncate(total_block_start)
-
-            queue.put(last.getvalue())
-            # break
-
-        else:
-          queue.put(chunk)
+    # Hold each chunk back until the next arrives, so the last one can have
+    # the footer trimmed.
+    previous = None
+    for chunk in itertools.chain(head, chunks):
+      if previous is not None:
+        queue.put(previous)
+      previous = chunk
 
-        chunk_id += 1
+    if previous is not None:
+      queue.put(self._trim_footer(previous))
 
     queue.join()
     streamer.stop()
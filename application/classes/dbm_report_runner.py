@@ -14,19 +14,22 @@
 from __future__ import annotations
 
 import logging
-import pprint
 import time
 
 from classes import ReportRunner
 from classes.dbm import DBM
 from classes.report2bq import Report2BQ
 from classes.report_type import Type
-from io import StringIO
 
 
 class DBMReportRunner(ReportRunner):
   report_type = Type.DV360
 
+  # attended runs poll the report state, backing off from `poll_delay` to at
+  # most `max_poll_delay` seconds between checks.
+  poll_delay = 5
+  max_poll_delay = 120
+
   def __init__(self, dbm_id: str=None,
                email: str=None, project: str=None, **unused) -> DBMReportRunner:
     """Initialize the runner.
@@ -71,22 +74,22 @@ class DBMReportRunner(ReportRunner):
     """
     response = dbm.run_report(self.dbm_id)
     if response:
-      buffer = StringIO()
-      pprint.pprint(response, stream=buffer)
-      logging.info(buffer.getvalue())
+      logging.info('Report %s run: %s', self.dbm_id, response)
 
+    delay = self.poll_delay
     while True:
       status = dbm.report_state(self.dbm_id)
       logging.info(f'Report {self.dbm_id} status: {status}')
       if status == 'RUNNING':
-        time.sleep(10)
+        time.sleep(delay)
+        delay = min(delay * 1.5, self.max_poll_delay)
 
       elif status == 'DONE':
         report2bq = Report2BQ(
-          dv360=True, dv360_id=self.dbm_id, email=self.email,
+          product=Type.DV360, report_id=self.dbm_id, email=self.email,
           project=self.project
         )
-        report2bq.handle_report_fetcher(fetcher=dbm, report_id=self.dbm_id)
+        report2bq.handle_report_fetcher(fetcher=dbm)
         break
 
       else:
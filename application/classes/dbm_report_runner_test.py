@@ -0,0 +1,54 @@
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from unittest import mock
+
+from classes import dbm_report_runner
+from classes.dbm import DBM
+
+
+class DBMReportRunnerTest(unittest.TestCase):
+
+  @mock.patch.object(dbm_report_runner.time, 'sleep', autospec=True)
+  def test_attended_run_backs_off(self, mock_sleep):
+    runner = dbm_report_runner.DBMReportRunner(dbm_id='1', email='foo@bar.com',
+                                               project='foo')
+    runner.max_poll_delay = 10
+    mock_dbm = mock.create_autospec(DBM, instance=True)
+    mock_dbm.run_report.return_value = {}
+    mock_dbm.report_state.side_effect = ['RUNNING'] * 4 + ['FAILED']
+
+    runner._attended_run(mock_dbm)
+
+    self.assertEqual([mock.call(5), mock.call(7.5), mock.call(10),
+                      mock.call(10)],
+                     mock_sleep.call_args_list)
+
+  @mock.patch.object(dbm_report_runner, 'Report2BQ', autospec=True)
+  def test_attended_run_done(self, mock_report2bq):
+    runner = dbm_report_runner.DBMReportRunner(dbm_id='1', email='foo@bar.com',
+                                               project='foo')
+    mock_dbm = mock.create_autospec(DBM, instance=True)
+    mock_dbm.run_report.return_value = {}
+    mock_dbm.report_state.return_value = 'DONE'
+
+    runner._attended_run(mock_dbm)
+
+    mock_report2bq.return_value.handle_report_fetcher.assert_called_once_with(
+        fetcher=mock_dbm)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,297 @@
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import time
+import unittest
+
+from unittest import mock
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from classes import dbm
+
+BODY = b'''Date,Advertiser,Impressions
+2022-01-01,Foo,10
+2022-01-02,Bar,20
+'''
+FOOTER = b''',,30
+
+Report Time:,2022/01/03 00:00
+Date Range:,2022/01/01 to 2022/01/02
+Group By:,Date
+Group By:,Advertiser
+'''
+URL = 'https://storage.googleapis.com/bucket/report.csv'
+
+
+class MockResponse(object):
+
+  def __init__(self, data: bytes, status_code: int = 200,
+               headers: dict = None):
+    self.content = data
+    self.status_code = status_code
+    self.headers = headers or {'content-length': str(len(data))}
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *unused):
+    pass
+
+  def raise_for_status(self):
+    pass
+
+  def iter_content(self, chunk_size: int):
+    for i in range(0, len(self.content), chunk_size):
+      yield self.content[i:i + chunk_size]
+
+
+def ranged_get(data: bytes):
+  """A fake session.get serving `data`, honouring any Range header."""
+  def _get(path, headers=None, **unused):
+    if not (headers and 'Range' in headers):
+      return MockResponse(data)
+
+    first, last = map(int, headers['Range'][len('bytes='):].split('-'))
+    if first >= len(data):
+      return MockResponse(b'', status_code=416)
+
+    content = data[first:last + 1]
+    return MockResponse(
+        content, status_code=206,
+        headers={'content-length': str(len(content)),
+                 'content-range': f'bytes {first}-{last}/{len(data)}'})
+  return _get
+
+
+class DBMTest(unittest.TestCase):
+
+  def setUp(self):
+    self.dbm = dbm.DBM(email='foo@bar.com', project='foo')
+
+  @mock.patch.object(dbm.DBM, 'service', new_callable=mock.PropertyMock)
+  def test_normalize_report_details(self, mock_service):
+    mock_service.return_value.queries.return_value.get.return_value.\
+        execute.return_value = {
+            'queryId': '1',
+            'metadata': {
+                'title': 'My Report (daily)',
+                'googleCloudStoragePathForLatestReport': URL,
+                'latestReportRunTimeMs': '1641168000000',
+            },
+            'params': {'type': 'STANDARD'},
+            'schedule': {'frequency': 'DAILY'},
+        }
+
+    report = self.dbm.normalize_report_details({}, '1')
+    self.assertEqual('My_Report__daily_', report['report_name'])
+    self.assertEqual(URL, report['current_path'])
+    self.assertEqual(
+        time.strftime('%Y%m%d%H%M', time.localtime(1641168000)),
+        report['last_updated'])
+
+  @mock.patch.object(dbm.DBM, 'service', new_callable=mock.PropertyMock)
+  def test_normalize_report_details_never_run(self, mock_service):
+    mock_service.return_value.queries.return_value.get.return_value.\
+        execute.return_value = {
+            'queryId': '1',
+            'metadata': {'title': 'My Report'},
+            'params': {'type': 'STANDARD'},
+        }
+
+    report = self.dbm.normalize_report_details({}, '1')
+    self.assertEqual('', report['current_path'])
+    self.assertEqual(time.strftime('%Y%m%d%H%M', time.localtime(0)),
+                     report['last_updated'])
+    self.assertIsNone(report['update_cadence'])
+
+  @mock.patch.object(dbm.DBM, 'service', new_callable=mock.PropertyMock)
+  def test_report_definition_reused(self, mock_service):
+    mock_get = mock_service.return_value.queries.return_value.get
+    mock_get.return_value.execute.return_value = {
+        'queryId': '1',
+        'metadata': {'title': 'My Report'},
+        'params': {'type': 'STANDARD'},
+    }
+
+    definition = self.dbm.get_report_definition(1)
+    self.assertEqual('My_Report',
+                     self.dbm.normalize_report_details({}, '1')['report_name'])
+    self.assertIs(definition, self.dbm.get_report_definition('1'))
+    mock_get.assert_called_once_with(queryId=1)
+
+  @mock.patch.object(dbm.DBM, 'service', new_callable=mock.PropertyMock)
+  def test_get_latest_report_file(self, mock_service):
+    mock_service.return_value.queries.return_value.reports.return_value.\
+        list.return_value.execute.return_value = {
+            'reports': [
+                {'metadata': {'status': {'finishTimeMs': '30'}}, 'id': 3},
+                {'metadata': {'status': {'finishTimeMs': '200'}}, 'id': 2},
+                {'metadata': {'status': {'state': 'RUNNING'}}, 'id': 4},
+            ]}
+
+    self.assertEqual(2, self.dbm.get_latest_report_file('1')['id'])
+
+  @mock.patch.object(dbm.DBM, 'service', new_callable=mock.PropertyMock)
+  def test_get_latest_report_file_still_running(self, mock_service):
+    mock_service.return_value.queries.return_value.reports.return_value.\
+        list.return_value.execute.return_value = {
+            'reports': [{'metadata': {'status': {'state': 'RUNNING'}}}]}
+
+    self.assertEqual({}, self.dbm.get_latest_report_file('1'))
+
+  @mock.patch.object(dbm.DBM, 'service', new_callable=mock.PropertyMock)
+  def test_report_state(self, mock_service):
+    mock_service.return_value.queries.return_value.reports.return_value.\
+        list.return_value.execute.return_value = {
+            'reports': [
+                {'metadata': {'reportDataStartTimeMs': '200',
+                              'status': {'state': 'RUNNING'}}},
+                {'metadata': {'reportDataStartTimeMs': '30',
+                              'status': {'state': 'DONE'}}},
+            ]}
+
+    self.assertEqual('RUNNING', self.dbm.report_state('1'))
+
+  @mock.patch.object(dbm.decorators.time, 'sleep', autospec=True)
+  @mock.patch.object(dbm.DBM, 'service', new_callable=mock.PropertyMock)
+  def test_run_report_bad_request_not_retried(self, mock_service,
+                                              mock_sleep):
+    queries = mock_service.return_value.queries.return_value
+    queries.reports.return_value.list.return_value.execute.return_value = {}
+    execute = queries.run.return_value.execute
+    execute.side_effect = HttpError(httplib2.Response({'status': 400}),
+                                    b'Bad request')
+
+    with self.assertRaises(HttpError):
+      self.dbm.run_report('1')
+    execute.assert_called_once()
+    mock_sleep.assert_not_called()
+
+  @mock.patch.object(dbm.decorators.time, 'sleep', autospec=True)
+  @mock.patch.object(dbm.DBM, 'service', new_callable=mock.PropertyMock)
+  def test_run_report_server_error_retried(self, mock_service, mock_sleep):
+    queries = mock_service.return_value.queries.return_value
+    queries.reports.return_value.list.return_value.execute.return_value = {}
+    execute = queries.run.return_value.execute
+    execute.side_effect = [
+        HttpError(httplib2.Response({'status': 503}), b'Unavailable'),
+        {'key': {'reportId': '2'}}]
+
+    self.assertEqual({'key': {'reportId': '2'}}, self.dbm.run_report('1'))
+    self.assertEqual(2, execute.call_count)
+
+  def test_trim_footer(self):
+    self.assertEqual(BODY[:-1], self.dbm._trim_footer(BODY + FOOTER))
+
+  def test_trim_footer_no_totals(self):
+    body = BODY + b',,5\n2022-01-03,Baz,1\n'
+    self.assertEqual(body[:-1], self.dbm._trim_footer(body + FOOTER[5:]))
+
+  def test_trim_footer_no_footer(self):
+    self.assertEqual(BODY, self.dbm._trim_footer(BODY))
+
+  @mock.patch.object(dbm._SESSION, 'get', autospec=True)
+  def test_read_header(self, mock_get):
+    mock_get.return_value = MockResponse(BODY)
+
+    headers, _ = self.dbm.read_header(
+        dbm.ReportConfig(id='1', current_path=URL))
+    self.assertEqual(['Date', 'Advertiser', 'Impressions'], headers)
+    self.assertEqual((URL, BODY), self.dbm._header_prefix)
+
+  @mock.patch.object(dbm._SESSION, 'get', autospec=True)
+  def test_read_header_sample(self, mock_get):
+    mock_get.side_effect = ranged_get(BODY)
+    self.dbm.header_sample_size = 50
+
+    headers, types = self.dbm.read_header(
+        dbm.ReportConfig(id='1', current_path=URL))
+    self.assertEqual({'Range': 'bytes=0-49'},
+                     mock_get.call_args.kwargs['headers'])
+    self.assertEqual(['Date', 'Advertiser', 'Impressions'], headers)
+    self.assertEqual('INTEGER', types[2])
+    self.assertEqual((URL, BODY[:50]), self.dbm._header_prefix)
+
+  @mock.patch.object(dbm._SESSION, 'get', autospec=True)
+  def test_download(self, mock_get):
+    mock_get.side_effect = ranged_get(BODY)
+
+    self.assertEqual([BODY[i:i + 16] for i in range(0, len(BODY), 16)],
+                     list(self.dbm._download(URL, 16)))
+
+  @mock.patch.object(dbm._SESSION, 'get', autospec=True)
+  def test_download_reuses_header(self, mock_get):
+    mock_get.side_effect = ranged_get(BODY)
+    self.dbm._header_prefix = (URL, BODY[:16])
+
+    self.assertEqual(BODY, b''.join(self.dbm._download(URL, 16)))
+    self.assertEqual({'Range': 'bytes=16-31'},
+                     mock_get.call_args_list[0].kwargs['headers'])
+    self.assertIsNone(self.dbm._header_prefix)
+
+  @mock.patch.object(dbm._SESSION, 'get', autospec=True)
+  def test_download_range_ignored(self, mock_get):
+    mock_get.return_value = MockResponse(BODY)
+    self.dbm._header_prefix = (URL, BODY[:16])
+
+    self.assertEqual(BODY, b''.join(self.dbm._download(URL, 16)))
+
+  @mock.patch.object(dbm._SESSION, 'get', autospec=True)
+  def test_download_range_ignored_chunked(self, mock_get):
+    mock_get.return_value = MockResponse(
+        BODY, headers={'transfer-encoding': 'chunked'})
+
+    self.assertEqual(BODY, b''.join(self.dbm._download(URL, 16)))
+
+  @mock.patch.object(dbm._SESSION, 'get', autospec=True)
+  def test_download_header_was_whole_file(self, mock_get):
+    mock_get.side_effect = ranged_get(BODY)
+    self.dbm._header_prefix = (URL, BODY)
+
+    self.assertEqual([BODY], list(self.dbm._download(URL, 1024)))
+
+  @mock.patch.object(dbm, 'Cloud_Storage', autospec=True)
+  @mock.patch.object(dbm.DBM, 'credentials', new_callable=mock.PropertyMock)
+  @mock.patch.object(dbm._SESSION, 'get', autospec=True)
+  def test_stream_to_gcs_small_report(self, mock_get, unused_credentials,
+                                      mock_storage):
+    mock_get.side_effect = ranged_get(BODY + FOOTER)
+
+    self.dbm.stream_to_gcs('bucket',
+                           dbm.ReportConfig(id='1', current_path=URL))
+    mock_storage.client.return_value.bucket.return_value.blob.\
+        return_value.upload_from_string.assert_called_once_with(BODY[:-1])
+
+  @mock.patch.object(dbm, 'ThreadedGCSObjectStreamUpload', autospec=True)
+  @mock.patch.object(dbm, 'Cloud_Storage', autospec=True)
+  @mock.patch.object(dbm.DBM, 'credentials', new_callable=mock.PropertyMock)
+  @mock.patch.object(dbm._SESSION, 'get', autospec=True)
+  def test_stream_to_gcs_large_report(self, mock_get, unused_credentials,
+                                      mock_storage, mock_streamer):
+    mock_get.side_effect = ranged_get(BODY + FOOTER)
+    self.dbm.small_report_size = 16
+    self.dbm.chunk_multiplier = 1
+    written = []
+    with mock.patch.object(dbm, 'Queue', autospec=True) as mock_queue:
+      mock_queue.return_value.put.side_effect = \
+          lambda chunk: written.append(bytes(chunk))
+      self.dbm.stream_to_gcs('bucket',
+                             dbm.ReportConfig(id='1', current_path=URL))
+
+    self.assertEqual(BODY[:-1], b''.join(written))
+    mock_queue.assert_called_once_with(maxsize=self.dbm.upload_queue_size)
+    mock_streamer.return_value.start.assert_called_once()
+    mock_streamer.return_value.stop.assert_called_once()
+    mock_storage.client.return_value.bucket.assert_not_called()
@@ -14,33 +14,50 @@
 #
 from __future__ import annotations
 
-import datetime
-import io
 import logging
+import time
 from queue import Queue
 from typing import Any, Dict, List, Mapping, Tuple
 
-from auth import credentials
-from googleapiclient import http
-from service_framework.services import Service
+from google.auth.transport.requests import AuthorizedSession
+from googleapiclient.errors import HttpError
 
 from classes import Fetcher, ReportFetcher, csv_helpers
 from classes.cloud_storage import Cloud_Storage
-from classes.decorators import retry
+from classes.decorators import lazy_property, retry
 from classes.gcs_streaming import ThreadedGCSObjectStreamUpload
 from classes.report_config import ReportConfig
 from classes.report_type import Type
 
+# the line ending the CM pre-header; the CSV proper starts after it.
+_HEADER_MARKER = b'Report Fields\n'
+# the totals row CM appends to the end of the CSV.
+_GRAND_TOTAL = b'Grand Total'
+
 
 class DCM(ReportFetcher, Fetcher):
   report_type = Type.CM
   service_definition = Type.CM.service
+  # the amount of the report first read to find the columns and their types;
+  # doubled until the column headers are found, up to `max_header_sample_size`.
+  header_sample_size = 16 * 1024
+  max_header_sample_size = 160 * 1024
 
   def __init__(self, email: str, profile: str, project: str) -> DCM:
     self.project = project
     self.email = email
     self.profile = profile
 
+  @lazy_property
+  def _session(self) -> AuthorizedSession:
+    """An authorized session for downloading the report files."""
+    return AuthorizedSession(credentials=self.credentials.credentials)
+
+  def _media_url(self, report_data: ReportConfig) -> str:
+    """The download url of a report's latest file."""
+    return self.service.files().get_media(
+        reportId=report_data.id, fileId=report_data.report_file.id).uri
+
   def get_reports(self) -> List[Dict[str, Any]]:
     """Fetches the list of reports.
 
@@ -62,7 +79,7 @@ class DCM(ReportFetcher, Fetcher):
         **fields
     )
     if 'items' in result:
-      reports = [*reports, *result['items']]
+      reports.extend(result['items'])
 
     return reports
 
@@ -81,15 +98,20 @@ class DCM(ReportFetcher, Fetcher):
       files (List[Dict[str, Any]]): List of latest DCM report files details
     """
     files = self.fetch(method=self.service.reports().files().list,
-                       **{'profileId': self.profile,
-                           'reportId': report_id,
-                           'maxResults': '5',
-                           'sortField': 'LAST_MODIFIED_TIME',
-                           'sortOrder': 'DESCENDING',
-                          })
+                       **self._report_files_args(report_id))
 
     return files.get('items', [])
 
+  def _report_files_args(self, report_id: int) -> Dict[str, Any]:
+    return {'profileId': self.profile,
+            'reportId': report_id,
+            'maxResults': '5',
+            'sortField': 'LAST_MODIFIED_TIME',
+            'sortOrder': 'DESCENDING',
+            'fields': 'items(dateRange,fileName,format,id,lastModifiedTime,'
+                      'reportId,status,urls)',
+            }
+
   def get_report_definition(self,
                             report_id: int,
                             fields: str = None) -> Mapping[str, Any]:
@@ -110,17 +132,42 @@ class DCM(ReportFetcher, Fetcher):
 
     return result
 
+  @retry(HttpError, tries=3, delay=5, backoff=2)
   def get_latest_report_file(self, report_id: int) -> Dict[str, Any]:
     """Fetches the most recent available dcm report file.
 
+    The report definition and its file list are independent, so they are
+    fetched together in a single batch request.
+
     Args:
       report_id: report id
 
     Returns:
       Available report file details
     """
-    report = self.get_report_definition(report_id)
-    files = self.get_report_files(report_id)
+    responses = {}
+    errors = []
+
+    def _callback(request_id: str, response: Dict[str, Any],
+                  exception: Exception) -> None:
+      if exception:
+        errors.append(exception)
+      else:
+        responses[request_id] = response
+
+    batch = self.service.new_batch_http_request(callback=_callback)
+    batch.add(self.service.reports().get(profileId=self.profile,
+                                         reportId=report_id),
+              request_id='report')
+    batch.add(self.service.reports().files().list(
+        **self._report_files_args(report_id)), request_id='files')
+    batch.execute()
+
+    if errors:
+      raise errors[0]
+
+    report = responses['report']
+    files = responses['files'].get('items', [])
 
     for file in files:
       if file['status'] == 'REPORT_AVAILABLE':
@@ -142,22 +189,19 @@ class DCM(ReportFetcher, Fetcher):
     Returns:
       Normalized data structure
     """
-    if ('report_file' in report_object) and \
-       (report_object['report_file'] is not None):
-      gcs_path = report_object['report_file']['urls']['apiUrl']
-      latest_runtime = report_object['report_file']['lastModifiedTime']
+    if report_file := report_object.get('report_file'):
+      gcs_path = report_file['urls']['apiUrl']
+      latest_runtime = report_file['lastModifiedTime']
 
     else:
       gcs_path = ''
       latest_runtime = 0
 
-    if 'schedule' in report_object:
-      if report_object['schedule']['active'] is False:
-        schedule_frequency = 'MANUAL'
-      else:
-        schedule_frequency = report_object['schedule']['repeats']
-    else:
+    schedule = report_object.get('schedule', {})
+    if schedule.get('active') is False:
       schedule_frequency = 'MANUAL'
+    else:
+      schedule_frequency = schedule.get('repeats', 'MANUAL')
 
     # Normalize report data object
     report_data = {
@@ -168,8 +212,8 @@ class DCM(ReportFetcher, Fetcher):
         'type': report_object['type'],
         'current_path': gcs_path,
         'last_updated':
-        datetime.datetime.fromtimestamp(
-            float(latest_runtime)/1000.0).strftime("%Y%m%d%H%M"),
+        time.strftime('%Y%m%d%H%M',
+                      time.localtime(int(latest_runtime) // 1000)),
         'update_cadence': schedule_frequency,
     }
     if 'report_file' in report_object:
@@ -179,25 +223,18 @@ class DCM(ReportFetcher, Fetcher):
     return report_data
 
   def _find_first_data_byte(self, data: bytes) -> int:
-    HEADER_MARKER = b'Report Fields\n'
-
-    # Parse out the file; look for 'Report Fields\n'
-    start = data.find(HEADER_MARKER) + len(HEADER_MARKER)
-    return start
+    # Parse out the file; look for 'Report Fields\n'. -1 means there is no
+    # pre-header to skip.
+    start = data.find(_HEADER_MARKER)
+    return start if start == -1 else start + len(_HEADER_MARKER)
 
   def _read_data_chunk(self, report_data: ReportConfig,
                        chunk: int = 16384) -> bytes:
-    report_id = report_data.id
-    file_id = report_data.report_file.id
-    request = self.service.files().get_media(
-        reportId=report_id, fileId=file_id)
-
-    # Create a media downloader instance.
-    out_file = io.BytesIO()
-    downloader = http.MediaIoBaseDownload(out_file, request, chunksize=chunk)
-    downloader.next_chunk()
-
-    return out_file.getvalue()
+    with self._session.get(self._media_url(report_data),
+                           headers={'Range': f'bytes=0-{chunk - 1}'},
+                           stream=True) as response:
+      response.raise_for_status()
+      return next(response.iter_content(chunk), b'')
 
   def read_header(self,
                   report_details: ReportConfig) -> Tuple[List[str],
@@ -211,11 +248,22 @@ class DCM(ReportFetcher, Fetcher):
         Tuple[List[str], List[str]]: the csv headers and column types
     """
     if report_details.report_file:
-      data = self._read_data_chunk(report_details, 163840)
-      bytes_io = io.BytesIO(data)
-      csv_start = self._find_first_data_byte(bytes_io.getvalue())
-      bytes_io.seek(0 if csv_start == -1 else csv_start)
-      return csv_helpers.get_column_types(io.BytesIO(bytes_io.read()))
+      sample_size = self.header_sample_size
+      while True:
+        data = self._read_data_chunk(report_details, sample_size)
+        csv_start = self._find_first_data_byte(data)
+        header_end = data.find(b'\n', max(csv_start, 0))
+        if (csv_start != -1 and header_end != -1) or \
+                len(data) < sample_size or \
+                sample_size >= self.max_header_sample_size:
+          break
+        sample_size = min(sample_size * 2, self.max_header_sample_size)
+
+      # only infer the types from complete rows.
+      start = 0 if csv_start == -1 else csv_start
+      last_row_end = data.rfind(b'\n') + 1
+      end = last_row_end if last_row_end > start else len(data)
+      return csv_helpers.get_column_types(memoryview(data)[start:end])
 
     else:
       return (None, None)
@@ -230,58 +278,58 @@ class DCM(ReportFetcher, Fetcher):
     if not report_data.report_file:
       return
 
-    queue = Queue()
+    queue = Queue(maxsize=self.upload_queue_size)
 
     report_id = report_data.id
-    file_id = report_data.report_file.id
-
     chunk_size = self.chunk_multiplier * 1024 * 1024
-    out_file = io.BytesIO()
-
-    download_request = self.service.files().get_media(
-        reportId=report_id, fileId=file_id)
-    downloader = http.MediaIoBaseDownload(
-        out_file, download_request, chunksize=chunk_size)
 
     # Execute the get request and download the file.
     streamer = ThreadedGCSObjectStreamUpload(
-        creds=credentials.Credentials(
-            email=self.email, project=self.project).credentials,
-        client=Cloud_Storage.client(),
+        creds=self.credentials.credentials,
+        client=Cloud_Storage.client(credentials=self.credentials),
         bucket_name=bucket,
         blob_name='{id}.csv'.format(id=report_id),
         chunk_size=chunk_size,
         streamer_queue=queue)
     streamer.start()
 
-    download_finished = False
-    first = True
-    while download_finished is False:
-      status, download_finished = downloader.next_chunk()
+    # One streamed GET for the whole file, rather than a ranged request per
+    # chunk.
+    with self._session.get(self._media_url(report_data),
+                           stream=True) as response:
+      response.raise_for_status()
+      total_size = int(response.headers.get('content-length', 0))
+      downloaded = 0
+      first = True
+      pending = ()
+
+      # Hold each chunk back until the next arrives, so the last one is known
+      # and can have its "Grand Total" dropped.
+      # Reads allocate their full size up front, so a report smaller than a
+      # chunk is read in one piece of its own size.
+      read_size = min(chunk_size, total_size) if total_size else chunk_size
+      for chunk in response.iter_content(chunk_size=read_size):
+        downloaded += len(chunk)
+        start = 0
+
+        # First chunk, skip the pre-header
+        if first:
+          csv_start = self._find_first_data_byte(chunk)
+          start = 0 if csv_start == -1 else csv_start
+          first = False
+
+        logging.info('Downloader status %s of %s',
+                     f'{downloaded:,}', f'{total_size:,}')
+
+        if pending:
+          queue.put(memoryview(pending[0])[pending[1]:])
+        pending = (chunk, start)
 
       # Last chunk, drop the "Grand Total"
-      if download_finished:
-        total_pos = out_file.getvalue().rfind(b'Grand Total')
-        if total_pos != -1:
-          out_file.truncate(total_pos)
-
-      # First chunk, skip the pre-header
-      if first:
-        csv_start = self._find_first_data_byte(out_file.getvalue())
-        out_file.seek(0 if csv_start == -1 else csv_start)
-        first = False
-      else:
-        out_file.seek(0)
-
-      logging.info('Downloader status %s, %s of %s',
-                   f'{(status.resumable_progress/status.total_size):3.2%}',
-                   f'{status.resumable_progress:,}',
-                   f'{status.total_size:,}')
-
-      chunk = out_file.read(chunk_size)
-      queue.put(chunk)
-      out_file.seek(0)
-      out_file.truncate(0)
+      if pending:
+        chunk, start = pending
+        end = chunk.rfind(_GRAND_TOTAL)
+        queue.put(memoryview(chunk)[start:len(chunk) if end == -1 else end])
 
     queue.join()
     streamer.stop()
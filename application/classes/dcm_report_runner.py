@@ -14,14 +14,12 @@
 from __future__ import annotations
 
 import logging
-import pprint
 import time
 
 from classes import ReportRunner
 from classes.dcm import DCM
 from classes.report2bq import Report2BQ
 from classes.report_type import Type
-from io import StringIO
 
 
 class DCMReportRunner(ReportRunner):
@@ -31,6 +29,11 @@ class DCMReportRunner(ReportRunner):
   """
   report_type = Type.CM
 
+  # attended runs poll the report state, backing off from `poll_delay` to at
+  # most `max_poll_delay` seconds between checks.
+  poll_delay = 5
+  max_poll_delay = 120
+
   def __init__(self, cm_id: str=None, profile: str=None,
                email: str=None, project: str=None, **unused) -> DCMReportRunner:
     """Initialize the runner.
@@ -77,22 +80,20 @@ class DCMReportRunner(ReportRunner):
     successful = []
     response = dcm.run_report(report_id=self.cm_id, synchronous=True)
     if response:
-      buffer = StringIO()
-      pprint.pprint(response, stream=buffer)
-      logging.info(buffer.getvalue())
+      logging.info('Report %s run: %s', self.cm_id, response)
 
+    delay = self.poll_delay
     while response['status'] == 'PROCESSING':
-      time.sleep(60 * 0.5)
+      time.sleep(delay)
+      delay = min(delay * 1.5, self.max_poll_delay)
       response = dcm.report_state(report_id=self.cm_id, file_id=response['id'])
-      buffer = StringIO()
-      pprint.pprint(response, stream=buffer)
-      logging.info(buffer.getvalue())
+      logging.info('Report %s state: %s', self.cm_id, response)
 
     report2bq = Report2BQ(
-      cm=True, cm_id=self.cm_id, email=self.email, project=self.project,
-      profile=self.cm_profile
+      product=Type.CM, report_id=self.cm_id, email=self.email,
+      project=self.project, profile=self.cm_profile
     )
-    report2bq.handle_report_fetcher(fetcher=dcm, report_id=self.cm_id)
+    report2bq.handle_report_fetcher(fetcher=dcm)
 
   def _unattended_run(self, dcm: DCM) -> None:
     """_unattended_run.
@@ -105,9 +106,7 @@ class DCMReportRunner(ReportRunner):
     """
     response = dcm.run_report(report_id=self.cm_id, synchronous=False)
     if response:
-      buffer = StringIO()
-      pprint.pprint(response, stream=buffer)
-      logging.info(buffer.getvalue())
+      logging.info('Report %s run: %s', self.cm_id, response)
 
       runner = {
         'type': Type.CM.value,
@@ -0,0 +1,47 @@
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from unittest import mock
+
+from classes import dcm_report_runner
+from classes.dcm import DCM
+
+
+class DCMReportRunnerTest(unittest.TestCase):
+
+  @mock.patch.object(dcm_report_runner, 'Report2BQ', autospec=True)
+  @mock.patch.object(dcm_report_runner.time, 'sleep', autospec=True)
+  def test_attended_run_backs_off(self, mock_sleep, mock_report2bq):
+    runner = dcm_report_runner.DCMReportRunner(cm_id='1', profile='2',
+                                               email='foo@bar.com',
+                                               project='foo')
+    runner.max_poll_delay = 10
+    mock_dcm = mock.create_autospec(DCM, instance=True)
+    mock_dcm.run_report.return_value = {'id': '3', 'status': 'PROCESSING'}
+    mock_dcm.report_state.side_effect = \
+        [{'id': '3', 'status': 'PROCESSING'}] * 3 + \
+        [{'id': '3', 'status': 'REPORT_AVAILABLE'}]
+
+    runner._attended_run(mock_dcm)
+
+    self.assertEqual([mock.call(5), mock.call(7.5), mock.call(10),
+                      mock.call(10)],
+                     mock_sleep.call_args_list)
+    mock_report2bq.return_value.handle_report_fetcher.assert_called_once_with(
+        fetcher=mock_dcm)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,193 @@
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import time
+import unittest
+
+from unittest import mock
+
+from classes import dcm
+from classes.report_config import ReportConfig
+
+PREHEADER = b'''Campaign Manager Report
+Report Fields
+'''
+BODY = b'''Date,Campaign,Impressions
+2022-01-01,Foo,10
+2022-01-02,Bar,20
+'''
+TOTAL = b'''Grand Total:,,30
+'''
+
+
+class MockResponse(object):
+  """A streamed response serving `data` in `chunk_size` pieces."""
+
+  def __init__(self, data: bytes, chunk_size: int):
+    self.data = data
+    self.chunk_size = chunk_size
+    self.headers = {'content-length': str(len(data))}
+    self.read_sizes = []
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *unused):
+    pass
+
+  def raise_for_status(self):
+    pass
+
+  def iter_content(self, chunk_size: int):
+    self.read_sizes.append(chunk_size)
+    for i in range(0, len(self.data), self.chunk_size):
+      yield self.data[i:i + self.chunk_size]
+
+
+class DCMTest(unittest.TestCase):
+
+  def setUp(self):
+    self.dcm = dcm.DCM(email='foo@bar.com', profile='1', project='foo')
+    self.report = ReportConfig.from_dict(
+        {'id': '1', 'report_file': {'id': '2'}})
+
+  @mock.patch.object(dcm.DCM, 'service', new_callable=mock.PropertyMock)
+  def test_get_latest_report_file(self, mock_service):
+    responses = {
+        'report': {'id': '1', 'name': 'Report'},
+        'files': {'items': [{'id': '3', 'status': 'PROCESSING'},
+                            {'id': '2', 'status': 'REPORT_AVAILABLE'}]},
+    }
+    batch = mock_service.return_value.new_batch_http_request.return_value
+    batch.execute.side_effect = lambda: [
+        mock_service.return_value.new_batch_http_request.call_args.kwargs[
+            'callback'](request_id, responses[request_id], None)
+        for request_id in responses]
+
+    report = self.dcm.get_latest_report_file('1')
+    self.assertEqual('2', report['report_file']['id'])
+    self.assertEqual('1', report['profile_id'])
+    self.assertEqual(2, batch.add.call_count)
+    batch.execute.assert_called_once()
+
+  def test_normalize_report_details(self):
+    report = self.dcm.normalize_report_details(
+        {'id': '1', 'ownerProfileId': '1', 'name': 'My Report',
+         'type': 'STANDARD',
+         'schedule': {'active': True, 'repeats': 'DAILY'},
+         'report_file': {'urls': {'apiUrl': 'https://foo'},
+                         'lastModifiedTime': '1641168000000'}}, '1')
+
+    self.assertEqual('My_Report', report['report_name'])
+    self.assertEqual('DAILY', report['update_cadence'])
+    self.assertEqual(
+        time.strftime('%Y%m%d%H%M', time.localtime(1641168000)),
+        report['last_updated'])
+
+  def test_normalize_report_details_never_run(self):
+    report = self.dcm.normalize_report_details(
+        {'id': '1', 'ownerProfileId': '1', 'name': 'My Report',
+         'type': 'STANDARD', 'schedule': {'active': False, 'repeats': 'DAILY'}},
+        '1')
+
+    self.assertEqual('', report['current_path'])
+    self.assertEqual('MANUAL', report['update_cadence'])
+    self.assertNotIn('report_file', report)
+
+  @mock.patch.object(dcm.DCM, 'service', new_callable=mock.PropertyMock)
+  @mock.patch.object(dcm.DCM, 'credentials', new_callable=mock.PropertyMock)
+  @mock.patch.object(dcm, 'AuthorizedSession', autospec=True)
+  def test_read_data_chunk(self, mock_session, unused_credentials,
+                           mock_service):
+    mock_service.return_value.files.return_value.get_media.return_value.uri = \
+        'https://foo'
+    mock_session.return_value.get.return_value = MockResponse(
+        PREHEADER + BODY, 1024)
+
+    self.assertEqual(PREHEADER + BODY,
+                     self.dcm._read_data_chunk(self.report, 4096))
+    mock_session.return_value.get.assert_called_once_with(
+        'https://foo', headers={'Range': 'bytes=0-4095'}, stream=True)
+
+  def test_read_header(self):
+    with mock.patch.object(self.dcm, '_read_data_chunk', autospec=True,
+                           return_value=PREHEADER + BODY):
+      headers, types = self.dcm.read_header(self.report)
+
+    self.assertEqual(['Date', 'Campaign', 'Impressions'], headers)
+    self.assertEqual('DATETIME', types[0])
+
+  def test_read_header_grows_sample(self):
+    data = PREHEADER + BODY
+    self.dcm.header_sample_size = 16
+    with mock.patch.object(self.dcm, '_read_data_chunk', autospec=True,
+                           side_effect=lambda _, size: data[:size]) \
+            as mock_read:
+      headers, _ = self.dcm.read_header(self.report)
+
+    self.assertEqual(['Date', 'Campaign', 'Impressions'], headers)
+    self.assertEqual([16, 32, 64],
+                     [c.args[1] for c in mock_read.call_args_list])
+
+  def test_read_header_partial_row(self):
+    with mock.patch.object(self.dcm, '_read_data_chunk', autospec=True,
+                           return_value=PREHEADER + BODY + b'2022-01-0'):
+      _, types = self.dcm.read_header(self.report)
+
+    self.assertEqual('DATETIME', types[0])
+
+  def test_find_first_data_byte(self):
+    self.assertEqual(len(PREHEADER),
+                     self.dcm._find_first_data_byte(PREHEADER + BODY))
+
+  def test_find_first_data_byte_no_preheader(self):
+    self.assertEqual(-1, self.dcm._find_first_data_byte(BODY))
+
+  def _stream(self, data: bytes, chunk_size: int) -> bytes:
+    written = []
+    self.response = MockResponse(data, chunk_size)
+    with mock.patch.object(dcm.DCM, 'service',
+                           new_callable=mock.PropertyMock), \
+        mock.patch.object(dcm.DCM, 'credentials',
+                          new_callable=mock.PropertyMock), \
+        mock.patch.object(dcm, 'Cloud_Storage', autospec=True), \
+        mock.patch.object(dcm, 'ThreadedGCSObjectStreamUpload',
+                          autospec=True), \
+        mock.patch.object(dcm, 'AuthorizedSession',
+                          autospec=True) as mock_session, \
+        mock.patch.object(dcm, 'Queue', autospec=True) as mock_queue:
+      mock_session.return_value.get.return_value = self.response
+      mock_queue.return_value.put.side_effect = \
+          lambda chunk: written.append(bytes(chunk))
+      self.dcm.stream_to_gcs('bucket', self.report)
+
+    mock_session.return_value.get.assert_called_once_with(mock.ANY,
+                                                          stream=True)
+    return written
+
+  def test_stream_to_gcs_single_chunk(self):
+    data = PREHEADER + BODY + TOTAL
+    self.assertEqual([BODY], self._stream(data, 1024))
+    self.assertEqual([len(data)], self.response.read_sizes)
+
+  def test_stream_to_gcs_many_chunks(self):
+    written = self._stream(PREHEADER + BODY + TOTAL, 48)
+    self.assertEqual(3, len(written))
+    self.assertEqual(BODY, b''.join(written))
+
+  def test_stream_to_gcs_no_preheader(self):
+    self.assertEqual([BODY], self._stream(BODY + TOTAL, 1024))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -13,6 +13,8 @@
 # limitations under the License.
 
 import logging
+import os
+import random
 import time
 import tracemalloc
 
@@ -30,11 +32,11 @@ def timeit(f: Callable):
       Any: the method's return.
   """
   def timed(*args: Mapping[str, Any], **kw: Mapping[str, Any]) -> Any:
-    ts = time.time()
+    ts = time.perf_counter()
     try:
       return f(*args, **kw)
     finally:
-      te = time.time()
+      te = time.perf_counter()
       logging.info('%s %0.3fms', f.__name__, ((te - ts) * 1000))
   return timed
 
@@ -42,6 +44,10 @@ def timeit(f: Callable):
 def measure_memory(f: Callable) -> Any:
   """Measures the execution time and memory usage of a method.
 
+  Memory is only traced if TRACE_MEMORY is set to '1', 'true' or 'yes' in
+  the environment, as tracemalloc slows down every allocation the method
+  makes.
+
   Args:
       f (Callable): the method.
 
@@ -49,23 +55,29 @@ def measure_memory(f: Callable) -> Any:
       Any: the method's return.
   """
   def decorate(*args: Mapping[str, Any], **kw: Mapping[str, Any]) -> Any:
+    trace = \
+        os.environ.get('TRACE_MEMORY', '').lower() in ('1', 'true', 'yes')
     try:
-      tracemalloc.start()
-      ts = time.time()
+      if trace:
+        tracemalloc.start()
+      ts = time.perf_counter()
       return f(*args, **kw)
     finally:
-      te = time.time()
-      current, peak = tracemalloc.get_traced_memory()
+      te = time.perf_counter()
       logging.info('Function Name        : %s', f.__name__)
       logging.info('Execution time       : %0.3fms', ((te - ts) * 1000))
-      logging.info('Current memory usage : %04.3fM', (current / 10**6))
-      logging.info('Peak                 : %04.3fM', (peak / 10**6))
-      tracemalloc.stop()
+      if trace:
+        current, peak = tracemalloc.get_traced_memory()
+        logging.info('Current memory usage : %04.3fM', (current / 10**6))
+        logging.info('Peak                 : %04.3fM', (peak / 10**6))
+        tracemalloc.stop()
   return decorate
 
 
 def retry(exceptions: Union[Exception, Tuple[Exception]],
-          tries: int = 4, delay: int = 5, backoff: int = 2):
+          tries: int = 4, delay: int = 5, backoff: int = 2,
+          jitter: bool = True,
+          retryable: Callable[[Exception], bool] = None):
   """Retry calling the decorated function using an exponential backoff.
 
     Args:
@@ -75,7 +87,11 @@ def retry(exceptions: Union[Exception, Tuple[Exception]],
         delay: Initial delay between retries in seconds.
         backoff: Backoff multiplier (e.g. value of 2 will double the delay
             each retry).
-        logger: Logger to use. If None, print.
+        jitter: Wait a random time between half and all of the current
+            delay, so that many workers failing together do not all retry
+            together.
+        retryable: Optional check of a caught exception; if it returns False
+            the exception is raised at once rather than retried.
     """
 
   def deco_retry(f):
@@ -87,9 +103,12 @@ def retry(exceptions: Union[Exception, Tuple[Exception]],
         try:
           return f(*args, **kwargs)
         except exceptions as e:
+          if retryable and not retryable(e):
+            raise
+          wait = random.uniform(mdelay / 2, mdelay) if jitter else mdelay
           logging.warning('Try %d: "%s" - retrying in %d seconds...',
-                          (tries - mtries + 1), e, mdelay)
-          time.sleep(mdelay)
+                          (tries - mtries + 1), e, int(wait))
+          time.sleep(wait)
           mtries -= 1
           mdelay *= backoff
       return f(*args, **kwargs)
@@ -86,6 +86,50 @@ class RetryTest(unittest.TestCase):
       MockValidator(lambda x: isinstance(x, Exception)),
       MockValidator(lambda x: isinstance(x, int)))
 
+  @mock.patch.object(decorators.time, 'sleep', autospec=True)
+  @mock.patch.object(decorators.random, 'uniform', autospec=True)
+  @mock.patch.object(logging, 'warning', autospec=True)
+  def test_retry_with_jitter(self, mock_logger, mock_uniform, mock_sleep):
+    mock_uniform.side_effect = lambda a, b: a
+
+    @decorators.retry(Exception, backoff=2, delay=4)
+    def _test_retry(mock_function):
+      mock_function()
+
+    mock_foo = mock.create_autospec(
+        self.dummy_function_for_mocking, side_effect=[EXCEPTION, EXCEPTION, ''])
+    _test_retry(mock_foo)
+    self.assertEqual([mock.call(2.0, 4), mock.call(4.0, 8)],
+                     mock_uniform.call_args_list)
+    self.assertEqual([mock.call(2.0), mock.call(4.0)],
+                     mock_sleep.call_args_list)
+
+  @mock.patch.object(decorators.time, 'sleep', autospec=True)
+  @mock.patch.object(logging, 'warning', autospec=True)
+  def test_retry_without_jitter(self, mock_logger, mock_sleep):
+    @decorators.retry(Exception, backoff=2, delay=4, jitter=False)
+    def _test_retry(mock_function):
+      mock_function()
+
+    mock_foo = mock.create_autospec(
+        self.dummy_function_for_mocking, side_effect=[EXCEPTION, EXCEPTION, ''])
+    _test_retry(mock_foo)
+    self.assertEqual([mock.call(4), mock.call(8)], mock_sleep.call_args_list)
+
+  @mock.patch.object(decorators.time, 'sleep', autospec=True)
+  def test_retry_not_retryable(self, mock_sleep):
+    @decorators.retry(Exception, backoff=2, delay=1,
+                      retryable=lambda e: not isinstance(e, ValueError))
+    def _test_retry(mock_function):
+      mock_function()
+
+    mock_foo = mock.create_autospec(
+        self.dummy_function_for_mocking, side_effect=[ValueError(), ''])
+    with self.assertRaises(ValueError):
+      _test_retry(mock_foo)
+    self.assertEqual(mock_foo.call_count, 1)
+    mock_sleep.assert_not_called()
+
 
 class TimeItTest(unittest.TestCase):
 
@@ -105,6 +149,7 @@ class TimeItTest(unittest.TestCase):
 
 class MeasureMemoryTest(unittest.TestCase):
 
+  @mock.patch.dict(decorators.os.environ, {'TRACE_MEMORY': '1'})
   @mock.patch.object(logging, 'info', autospec=True)
   def test_measure_memory(self, mock_logger):
     def dummy_function_for_mocking():
@@ -128,6 +173,29 @@ class MeasureMemoryTest(unittest.TestCase):
         'Peak                 : %04.3fM',
         MockValidator(lambda x: isinstance(x, float)))
 
+  @mock.patch.dict(decorators.os.environ, clear=True)
+  @mock.patch.object(decorators.tracemalloc, 'start', autospec=True)
+  @mock.patch.object(logging, 'info', autospec=True)
+  def test_measure_memory_untraced(self, mock_logger, mock_start):
+    @decorators.measure_memory
+    def _test_measure_memory():
+      return
+
+    _test_measure_memory()
+    mock_start.assert_not_called()
+    self.assertEqual(2, mock_logger.call_count)
+
+  @mock.patch.dict(decorators.os.environ, {'TRACE_MEMORY': 'false'})
+  @mock.patch.object(decorators.tracemalloc, 'start', autospec=True)
+  @mock.patch.object(logging, 'info', autospec=True)
+  def test_measure_memory_trace_disabled(self, unused_logger, mock_start):
+    @decorators.measure_memory
+    def _test_measure_memory():
+      return
+
+    _test_measure_memory()
+    mock_start.assert_not_called()
+
 
 class LazyPropertyTest(unittest.TestCase):
   class Foo(object):
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from typing import Dict
+
 from classes import ReportFetcher
 from classes.dbm import DBM
 from classes.dcm import DCM
@@ -19,14 +21,16 @@ from classes.sa360_web import SA360Web
 from classes.sa360_dynamic import SA360Dynamic
 from classes.report_type import Type
 
-
-def create_fetcher(product: Type, **kwargs) -> ReportFetcher:
-  if fetcher := {
+_FETCHERS: Dict[Type, type] = {
     Type.DV360: DBM,
     Type.CM: DCM,
     Type.SA360: SA360Web,
     Type.SA360_RPT: SA360Dynamic,
-  }.get(product):
+}
+
+
+def create_fetcher(product: Type, **kwargs) -> ReportFetcher:
+  if fetcher := _FETCHERS.get(product):
     return fetcher(**kwargs)
 
-  raise Exception(f'Cannot create fetcher for {product}')
+  raise KeyError(f'Cannot create fetcher for {product}')
@@ -0,0 +1,38 @@
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from unittest import mock
+
+from classes import fetcher_factory
+from classes.report_type import Type
+
+
+class FetcherFactoryTest(unittest.TestCase):
+
+  def test_create_fetcher(self):
+    mock_fetcher = mock.Mock()
+    with mock.patch.dict(fetcher_factory._FETCHERS, {Type.CM: mock_fetcher}):
+      fetcher = fetcher_factory.create_fetcher(Type.CM, email='foo@bar.com')
+
+    self.assertIs(mock_fetcher.return_value, fetcher)
+    mock_fetcher.assert_called_once_with(email='foo@bar.com')
+
+  def test_create_fetcher_unknown_product(self):
+    with self.assertRaises(KeyError):
+      fetcher_factory.create_fetcher(Type.GA360_RPT)
+
+
+if __name__ == '__main__':
+  unittest.main()
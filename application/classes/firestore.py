@@ -13,19 +13,36 @@
 # limitations under the License.
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional
 
+from cachetools import LRUCache, cached
+from google.api_core.exceptions import NotFound
 from google.cloud import firestore
 
 from classes import decorators
 from classes.report_type import Type
 
 
+@cached(cache=LRUCache(maxsize=1), lock=threading.Lock())
+def shared_client() -> firestore.Client:
+  """The datastore client.
+
+  Every Firestore helper talks to the project's default database, so one
+  client, and its gRPC channel, is shared by all of them in the process.
+
+  Returns:
+      firestore.Client: the client.
+  """
+  return firestore.Client()
+
+
 class Firestore(object):
   @decorators.lazy_property
   def client(self) -> Any:
     """The datastore client."""
-    return firestore.Client()
+    return shared_client()
 
   def __init__(self,
                email: str = None, project: str = None) -> Firestore:
@@ -43,6 +60,18 @@ class Firestore(object):
     documents = self.client.collection(type.value).list_documents()
     return documents
 
+  def stream_documents(self,
+                       type: Type) -> Iterator[firestore.DocumentSnapshot]:
+    """Streams the content of all documents of a given Type.
+
+    Unlike fetching each of the `get_all_documents` references in turn, this
+    returns every document's content in a single query.
+
+    Returns:
+        documents (Iterator[DocumentSnapshot]): all the documents
+    """
+    return self.client.collection(f'{type}').stream()
+
   def get_document(self, type: Type, id: str,
                    key: Optional[str] = None) -> Dict[str, Any]:
     """Loads a document (could be anything, 'type' identifies the root.)
@@ -66,6 +95,22 @@ class Firestore(object):
 
     return document.get(key) if key and document else document
 
+  def get_documents(self, type: Type,
+                    ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Loads several documents of the same type in one request.
+
+    Arguments:
+        type (Type): document type (document root in firestore)
+        ids (List[str]): document ids
+
+    Returns:
+        Dict[str, Dict[str, Any]]: the stored documents by id; any not present
+                                   are left out
+    """
+    references = [self.client.document(f'{type}/{id}') for id in ids]
+    return {snapshot.id: snapshot.to_dict()
+            for snapshot in self.client.get_all(references) if snapshot.exists}
+
   def store_document(self, type: Type, id: str,
                      document: Dict[str, Any]) -> None:
     """Stores a document.
@@ -82,6 +127,24 @@ class Firestore(object):
     report = self.client.document(f'{type}/{id}')
     report.set(document)
 
+  def move_document(self, source: Type, destination: Type, id: str,
+                    document: Dict[str, Any]) -> None:
+    """Moves a document from one collection to another.
+
+    The delete and the store are sent as a single batch, so the move is atomic
+    and takes one request.
+
+    Args:
+        source (Type): the collection the document is removed from.
+        destination (Type): the collection it is stored in.
+        id (str): the id of the document in both collections.
+        document (Dict[str, Any]): the document content to store.
+    """
+    batch = self.client.batch()
+    batch.delete(self.client.document(f'{source}/{id}'))
+    batch.set(self.client.document(f'{destination}/{id}'), document)
+    batch.commit()
+
   def update_document(self, type: Type, id: str,
                       new_data: Dict[str, Any]) -> None:
     """Updates a document.
@@ -96,9 +159,9 @@ class Firestore(object):
     """
     if collection := self.client.collection(f'{type}'):
       if document_ref := collection.document(document_id=id):
-        if document_ref.get().exists:
+        try:
           document_ref.update(new_data)
-        else:
+        except NotFound:
           document_ref.create(new_data)
 
   def delete_document(self, type: Type, id: str,
@@ -117,7 +180,10 @@ class Firestore(object):
     if collection := self.client.collection(f'{type}'):
       if document_ref := collection.document(document_id=id):
         if key:
-          document_ref.update({key: firestore.DELETE_FIELD})
+          try:
+            document_ref.update({key: firestore.DELETE_FIELD})
+          except NotFound:
+            logging.info('%s/%s does not exist, nothing to remove.', type, id)
         else:
           document_ref.delete()
 
@@ -138,14 +204,12 @@ class Firestore(object):
     Returns:
         List[str]: the list
     """
-    documents = []
-    collection = self.client.collection(f'{report_type}').list_documents()
-    for document in collection:
-      if key:
-        if document.id == key:
-          for _document in document.get().to_dict():
-            documents.append(_document)
-      else:
-        documents.append(document.id)
-
-    return documents
+    if key:
+      document = self.client.document(f'{report_type}/{key}').get()
+      return list(document.to_dict() or {})
+
+    # Project to just the document name so one query lists the ids without
+    # their content; an empty projection would return every field.
+    collection = self.client.collection(f'{report_type}')
+    return [document.id
+            for document in collection.select(['__name__']).stream()]
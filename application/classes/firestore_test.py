@@ -0,0 +1,140 @@
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from unittest import mock
+
+from classes import firestore
+
+
+class FirestoreTest(unittest.TestCase):
+
+  def setUp(self):
+    firestore.shared_client.cache_clear()
+
+  @mock.patch.object(firestore.firestore, 'Client', autospec=True)
+  def test_client_shared(self, mock_client):
+    first = firestore.Firestore(email='foo@bar.com', project='foo')
+    second = firestore.Firestore()
+
+    self.assertIs(first.client, second.client)
+    mock_client.assert_called_once_with()
+
+  @mock.patch.object(firestore, 'shared_client', autospec=True)
+  def test_get_documents(self, mock_client):
+    mock_client.return_value.get_all.return_value = [
+        mock.Mock(id='1', exists=True, to_dict=lambda: {'a': 1}),
+        mock.Mock(id='2', exists=False),
+    ]
+
+    self.assertEqual(
+        {'1': {'a': 1}},
+        firestore.Firestore().get_documents(firestore.Type.CM, ['1', '2']))
+    mock_client.return_value.get_all.assert_called_once()
+
+  @mock.patch.object(firestore, 'shared_client', autospec=True)
+  def test_update_document_missing(self, mock_client):
+    document = mock_client.return_value.collection.return_value.document
+    document.return_value.update.side_effect = firestore.NotFound('missing')
+
+    firestore.Firestore().update_document(firestore.Type.CM, '1', {'a': 1})
+    document.return_value.create.assert_called_once_with({'a': 1})
+    document.return_value.get.assert_not_called()
+
+  @mock.patch.object(firestore, 'shared_client', autospec=True)
+  def test_move_document(self, mock_client):
+    client = mock_client.return_value
+    client.document.side_effect = lambda path: path
+
+    firestore.Firestore().move_document(firestore.Type._JOBS,
+                                        firestore.Type._COMPLETED, '1',
+                                        {'a': 1})
+    batch = client.batch.return_value
+    batch.delete.assert_called_once_with('jobs/1')
+    batch.set.assert_called_once_with('jobs-completed/1', {'a': 1})
+    batch.commit.assert_called_once_with()
+
+  @mock.patch.object(firestore, 'shared_client', autospec=True)
+  def test_delete_document_key(self, mock_client):
+    document = mock_client.return_value.collection.return_value.document
+
+    firestore.Firestore().delete_document(firestore.Type.CM, '1', 'a')
+    document.return_value.update.assert_called_once_with(
+        {'a': firestore.firestore.DELETE_FIELD})
+    document.return_value.get.assert_not_called()
+
+  @mock.patch.object(firestore, 'shared_client', autospec=True)
+  def test_delete_document_key_missing(self, mock_client):
+    document = mock_client.return_value.collection.return_value.document
+    document.return_value.update.side_effect = firestore.NotFound('missing')
+
+    with self.assertLogs(level='INFO'):
+      firestore.Firestore().delete_document(firestore.Type.CM, '1', 'a')
+
+  @mock.patch.object(firestore, 'shared_client', autospec=True)
+  def test_list_documents_key(self, mock_client):
+    mock_client.return_value.document.return_value.get.return_value.\
+        to_dict.return_value = {'report_1': {}, 'report_2': {}}
+
+    self.assertEqual(
+        ['report_1', 'report_2'],
+        firestore.Firestore().list_documents(firestore.Type.SA360_RPT,
+                                             '_reports'))
+    mock_client.return_value.document.assert_called_once_with(
+        'sa360_report/_reports')
+    mock_client.return_value.collection.assert_not_called()
+
+  @mock.patch.object(firestore, 'shared_client', autospec=True)
+  def test_list_documents_key_missing(self, mock_client):
+    mock_client.return_value.document.return_value.get.return_value.\
+        to_dict.return_value = None
+
+    self.assertEqual(
+        [], firestore.Firestore().list_documents(firestore.Type.SA360_RPT,
+                                                 '_reports'))
+
+  @mock.patch.object(firestore, 'shared_client', autospec=True)
+  def test_list_documents(self, mock_client):
+    select = mock_client.return_value.collection.return_value.select
+    select.return_value.stream.return_value = [mock.Mock(id='_reports'),
+                                               mock.Mock(id='report_1')]
+
+    self.assertEqual(
+        ['_reports', 'report_1'],
+        firestore.Firestore().list_documents(firestore.Type.SA360_RPT))
+    mock_client.return_value.collection.assert_called_once_with(
+        'sa360_report')
+    select.assert_called_once_with(['__name__'])
+
+  @mock.patch.object(firestore, 'shared_client', autospec=True)
+  def test_document_paths_use_type_value(self, mock_client):
+    store = firestore.Firestore()
+    for type in firestore.Type:
+      with self.subTest(type=type):
+        mock_client.return_value.reset_mock()
+        store.get_document(type, '1')
+        store.store_document(type, '1', {})
+        store.get_documents(type, ['1'])
+        mock_client.return_value.document.assert_has_calls(
+            [mock.call(f'{type.value}/1')] * 3, any_order=True)
+
+        store.update_document(type, '1', {})
+        store.delete_document(type, '1')
+        store.list_documents(type)
+        mock_client.return_value.collection.assert_has_calls(
+            [mock.call(type.value)] * 3, any_order=True)
+
+
+if __name__ == '__main__':
+  unittest.main()
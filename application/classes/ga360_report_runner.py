@@ -14,8 +14,7 @@
 from __future__ import annotations
 
 import json
-import os
-from io import BytesIO, StringIO
+from io import StringIO
 from typing import Any, Dict
 
 from auth.credentials import Credentials
@@ -23,7 +22,7 @@ from auth.datastore.secret_manager import SecretManager
 from service_framework import service_builder
 
 from classes import (ReportRunner, csv_helpers, decorators, ga360_report,
-                     ga360_report_response)
+                     ga360_report_response, get_chunk_multiplier)
 from classes.gcs_streaming import GCSObjectStreamUpload
 from classes.report_type import Type
 
@@ -130,8 +129,8 @@ class GA360ReportRunner(ReportRunner):
         result.to_csv(output=output_buffer)
 
         # Write schema to Firestore - update like any other.
-        headers, types = csv_helpers.get_column_types(
-            BytesIO(output_buffer.getvalue().encode('utf-8')))
+        headers, _ = csv_helpers.get_column_types(
+            output_buffer.getvalue().encode('utf-8'), infer_types=False)
         schema = \
             csv_helpers.create_table_schema(column_headers=headers,
                                             column_types=None)
@@ -146,7 +145,7 @@ class GA360ReportRunner(ReportRunner):
         # cloud function. If they turn out to be bigger than this (which I
         # # don't believe GA360 reports will be), we should move to the
         # ThreadedGCSObjectStreamUpload version.
-        chunk_size = os.environ.get('CHUNK_MULTIPLIER', 128) * 1024 * 1024
+        chunk_size = get_chunk_multiplier(default=128) * 1024 * 1024
         streamer = GCSObjectStreamUpload(
             creds=self.credentials.credentials,
             bucket_name=f'{self._project}-report2bq-upload',
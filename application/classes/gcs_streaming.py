@@ -18,7 +18,7 @@ from __future__ import annotations
 import logging
 import queue
 import threading
-from typing import Optional
+from typing import Optional, Union
 
 from google.auth import credentials
 from google.auth.transport.requests import AuthorizedSession
@@ -54,11 +54,12 @@ class GCSStreamingUploader(object):
     self._credentials = creds # if creds else cloud_auth.get_default_credentials()
     self._client = \
       client if client else storage.Client(credentials=self._credentials)
-    self._client = storage.Client(credentials=self._credentials)
     self._bucket = self._client.get_bucket(bucket_name)
     self._blob = self._bucket.blob(blob_name)
 
-    self._buffer = b''
+    # A bytearray can be appended to and consumed from the front in place,
+    # where bytes would be copied in full on every write and read.
+    self._buffer = bytearray()
     self._buffer_size = 0
     self._chunk_size = chunk_size
     self._read = 0
@@ -94,11 +95,12 @@ class GCSStreamingUploader(object):
     logging.info('%s stopping... final write count: %s bytes',
                  self.streamer_type, f'{self._request.bytes_uploaded:,}')
 
-  def write(self, data: bytes) -> int:
+  def write(self, data: Union[bytes, memoryview]) -> int:
     """Write the buffer content.
 
     Args:
-        data (bytes): The data to be streamed to the GCS blob.
+        data (Union[bytes, memoryview]): The data to be streamed to the GCS
+          blob.
 
     Returns:
         int: number of bytes written
@@ -130,11 +132,12 @@ class GCSStreamingUploader(object):
         bytes: The bytes read.
     """
     to_read = min(chunk_size, self._buffer_size)
-    memview = memoryview(self._buffer)
-    self._buffer = memview[to_read:].tobytes()
+    with memoryview(self._buffer) as memview:
+      data = memview[:to_read].tobytes()
+    del self._buffer[:to_read]
     self._read += to_read
     self._buffer_size -= to_read
-    return memview[:to_read].tobytes()
+    return data
 
   def tell(self) -> int:
     """Report the current position in the buffer.
@@ -0,0 +1,51 @@
+# Copyright 2022 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from unittest import mock
+
+from classes import gcs_streaming
+
+
+class GCSStreamingUploaderTest(unittest.TestCase):
+
+  @mock.patch.object(gcs_streaming.storage, 'Client', autospec=True)
+  def setUp(self, unused_client):
+    self.streamer = gcs_streaming.GCSStreamingUploader(
+        bucket_name='bucket', blob_name='blob.csv', chunk_size=8)
+    self.streamer._request = mock.Mock(bytes_uploaded=0)
+    self.streamer._transport = mock.Mock()
+
+  def test_write_and_read(self):
+    self.streamer.write(b'abc')
+    self.streamer.write(memoryview(b'defg'))
+
+    self.assertEqual(b'abcd', self.streamer.read(4))
+    self.assertEqual(4, self.streamer.tell())
+    self.assertEqual(b'efg', self.streamer.read(8))
+    self.assertEqual(b'', self.streamer.read(8))
+    self.assertEqual(7, self.streamer.tell())
+
+  def test_write_transmits_full_chunks(self):
+    self.streamer._request.transmit_next_chunk.side_effect = \
+        lambda **unused: self.streamer.read(8)
+
+    self.streamer.write(b'0123456789')
+
+    self.streamer._request.transmit_next_chunk.assert_called_once()
+    self.assertEqual(b'89', self.streamer.read(8))
+
+
+if __name__ == '__main__':
+  unittest.main()
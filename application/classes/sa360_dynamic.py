@@ -17,7 +17,6 @@ limitations under the License.
 __author__ = ['davidharcombe@google.com (David Harcombe)']
 
 import logging
-import os
 import urllib.request
 # Other imports
 from contextlib import closing
@@ -26,12 +25,8 @@ from queue import Queue
 from typing import Any, Dict
 from urllib.request import urlopen
 
-from auth.credentials import Credentials
-from auth.datastore.secret_manager import SecretManager
 from google.auth.transport.requests import AuthorizedSession
 from google.cloud import storage
-from googleapiclient.discovery import Resource
-from service_framework import service_builder
 
 # Python Imports
 from classes import ReportFetcher, csv_helpers
@@ -44,9 +39,6 @@ from classes.report_type import Type
 
 class SA360Dynamic(ReportFetcher):
   report_type = Type.SA360_RPT
-  email = None
-  project = None
-  profile = None
 
   def __init__(self,
                email: str,
@@ -55,25 +47,18 @@ class SA360Dynamic(ReportFetcher):
                infer_schema: bool = False):
     self.email = email
     self.project = project
-    self.creds = Credentials(email=email,
-                             project=project, datastore=SecretManager)
-    self.credentials = storage.Client()._credentials
-    self.transport = AuthorizedSession(credentials=self.credentials)
+    self.creds = self.credentials
+    self.transport = \
+        AuthorizedSession(credentials=storage.Client()._credentials)
     self.append = append
     self.infer_schema = infer_schema
 
     self.firestore = Firestore(email=email, project=project)
 
-    self.chunk_multiplier = int(os.environ.get('CHUNK_MULTIPLIER', 64))
     self.bucket = f'{self.project}-report2bq-upload'
 
-  def service(self) -> Resource:
-    return service_builder.build_service(service=self.report_type.service,
-                                         key=self.creds.credentials)
-
   def handle_report(self, run_config: Dict[str, Any]) -> bool:
-    sa360_service = self.service()
-    request = sa360_service.reports().get(reportId=run_config['file_id'])
+    request = self.service.reports().get(reportId=run_config['file_id'])
 
     try:
       report = request.execute()
@@ -110,15 +95,18 @@ class SA360Dynamic(ReportFetcher):
       return False
 
   def read_header(self, report_config: dict) -> list:
-    r = urllib.request.Request(report_config['files'][0]['url'])
+    # only the header row is wanted, so ask for just the start of the file;
+    # if the Range is ignored, still only read that much.
+    sample_size = 64 * 1024
+    r = urllib.request.Request(report_config['files'][0]['url'],
+                               headers={'Range': f'bytes=0-{sample_size - 1}'})
     for header in self.creds.auth_headers:
       r.add_header(header, self.creds.auth_headers[header])
 
     with closing(urlopen(r)) as report:
-      data = report.read(self.chunk_multiplier * 1024 * 1024)
-      bytes_io = BytesIO(data)
+      data = report.read(sample_size)
 
-    return csv_helpers.get_column_types(bytes_io)
+    return csv_helpers.get_column_types(data, infer_types=False)
 
   @measure_memory
   def stream_to_gcs(self, report_details: Dict[str, Any],
@@ -129,7 +117,7 @@ class SA360Dynamic(ReportFetcher):
         bucket (str):  GCS Bucket
         report_details (dict):  Report definition
     """
-    queue = Queue()
+    queue = Queue(maxsize=self.upload_queue_size)
 
     report_id = run_config['report_id']
 
@@ -141,7 +129,7 @@ class SA360Dynamic(ReportFetcher):
 
     streamer = \
         ThreadedGCSObjectStreamUpload(
-            client=Cloud_Storage.client(),
+            client=Cloud_Storage.client(credentials=self.creds),
             creds=self.creds.credentials,
             bucket_name=self.bucket,
             blob_name=f'{report_id}.csv',
@@ -197,14 +197,13 @@ class SA360Manager(ReportManager):
       else:
         return f'{metric.value}'
 
-    sa360_reports = self.firestore.get_all_documents(type=Type.SA360_RPT)
+    sa360_reports = self.firestore.stream_documents(type=Type.SA360_RPT)
     results = []
     for sa360_report in sa360_reports:
       if sa360_report.id == '_reports':
         continue
 
-      if r := self.firestore.get_document(
-              type=Type.SA360_RPT, id=sa360_report.id):
+      if r := sa360_report.to_dict():
         try:
           report: SA360Job = SA360Job.from_dict(r)
 
@@ -15,7 +15,6 @@ from __future__ import annotations
 
 import csv
 import logging
-import os
 import re
 from html.parser import unescape
 from io import BytesIO, StringIO
@@ -23,8 +22,6 @@ from queue import Queue
 from typing import Any, Generator, List, Tuple
 
 import requests as req
-from auth.credentials import Credentials
-from auth.datastore.secret_manager import SecretManager
 from google.auth.transport.requests import AuthorizedSession
 from google.cloud import storage
 
@@ -54,9 +51,6 @@ class SA360Web(ReportFetcher):
   loader.
   """
   report_type = Type.SA360
-  email = None
-  project = None
-  profile = None
 
   def __init__(self,
                email: str,
@@ -65,19 +59,14 @@ class SA360Web(ReportFetcher):
                infer_schema: bool = False) -> SA360Web:
     self.email = email
     self.project = project
-    self.creds = Credentials(datastore=SecretManager,
-                             email=email, project=project)
-    self.credentials = storage.Client()._credentials
-    self.transport = AuthorizedSession(credentials=self.credentials)
+    self.creds = self.credentials
+    self.transport = \
+        AuthorizedSession(credentials=storage.Client()._credentials)
     self.append = append
     self.infer_schema = infer_schema
 
     self.firestore = Firestore(email=email, project=project)
 
-    # chunk_multiplier is set in the environment, but defaults to 64 - this
-    # leads to a 64M chunk size we can throw around. Given the memory
-    # constraints of a cloud function this seems like a good, safe number.
-    self.chunk_multiplier = int(os.environ.get('CHUNK_MULTIPLIER', 64))
     self.bucket = f'{self.project}-report2bq-upload'
 
   @retry(SA360Exception, tries=2)
@@ -195,7 +184,7 @@ class SA360Web(ReportFetcher):
       if first:
         _, fieldtypes = \
             csv_helpers.get_column_types(
-                BytesIO(output_buffer.getvalue().encode('utf-8')))
+                output_buffer.getvalue().encode('utf-8'))
 
       queue.put(output_buffer.getvalue().encode('utf-8'))
       chunk_id += 1
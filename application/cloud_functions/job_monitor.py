@@ -29,6 +29,10 @@ from google.cloud import storage
 from google.cloud.bigquery import LoadJob
 from typing import Any, Dict
 
+# the report products, whose collections hold the configs the jobs import
+# for; the internal types (_JOBS, _RUNNING and so on) never do.
+_PRODUCTS = [T for T in Type if not T.name.startswith('_')]
+
 
 class JobMonitor(object):
   """The process watching running Big Query import jobs
@@ -51,11 +55,19 @@ class JobMonitor(object):
       context (Dict[str, Any]):  context data. unused
     """
     attributes = data.get('attributes')
-    documents = self.firestore.get_all_documents(Type._JOBS)
+    documents = list(self.firestore.get_all_documents(Type._JOBS))
+    if not documents:
+      return
+
+    # fetch each product's configs for all the jobs at once, rather than
+    # one product and job at a time.
+    ids = [document.id for document in documents]
+    configs = {product: self.firestore.get_documents(product, ids)
+               for product in _PRODUCTS + [Type._JOBS]}
 
     for document in documents:
-      for product in [T for T in Type]:
-        if config := self.firestore.get_document(product, document.id):
+      for product in _PRODUCTS:
+        if config := configs[product].get(document.id):
           if config.get('dest_project'):
             user_creds = \
                 credentials.Credentials(datastore=SecretManager,
@@ -67,7 +79,7 @@ class JobMonitor(object):
           else:
             bq = bigquery.Client()
 
-          api_repr = document.get().to_dict()
+          api_repr = configs[Type._JOBS].get(document.id)
           if api_repr:
             try:
               job = LoadJob.from_api_repr(api_repr, bq)
@@ -120,8 +132,8 @@ class JobMonitor(object):
         report_id (int): [description]
         job (bigquery.LoadJob): [description]
     """
-    self.firestore.delete_document(Type._JOBS, report_id)
-    self.firestore.store_document(Type._COMPLETED, report_id, job.to_api_repr())
+    self.firestore.move_document(Type._JOBS, Type._COMPLETED, report_id,
+                                 job.to_api_repr())
 
   def notify(self,
              report_type: Type,
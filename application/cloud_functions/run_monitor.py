@@ -55,6 +55,16 @@ class RunMonitor(object):
     """The pubsub client"""
     return pubsub.PublisherClient()
 
+  @decorators.lazy_property
+  def schedulers(self) -> Dict[str, Scheduler]:
+    """The Scheduler helpers, one per report owner.
+
+    A Scheduler holds its owner's credentials, API service and location once
+    it has looked them up, so one is kept for each owner's runners rather
+    than building a new one for every runner.
+    """
+    return {}
+
   def remove_report_runner(self, id: str) -> None:
     """Deletes a report runner from the datastore
 
@@ -94,10 +104,10 @@ class RunMonitor(object):
         Type.SA360_RPT: self._check_sa360_report
     }
 
-    documents = list(self.firestore_client.get_all_documents(Type._RUNNING))
+    documents = list(self.firestore_client.stream_documents(Type._RUNNING))
     logging.info('To process: %s', ','.join([d.id for d in documents]))
     for document in documents:
-      run_config = document.get().to_dict()
+      run_config = document.to_dict()
       T = Type(run_config.get('type'))
       (success, job_config) = self._fetch_schedule(type=T,
                                                    run_config=run_config)
@@ -140,11 +150,14 @@ class RunMonitor(object):
     Returns:
         Dict[str, Any]: the schedule details.
     """
-    scheduler = Scheduler()
+    email = run_config.get('email')
+    if not (scheduler := self.schedulers.get(email)):
+      scheduler = self.schedulers[email] = Scheduler()
+
     return scheduler.process(
         action='get',
         project=os.environ['GCP_PROJECT'],
-        email=run_config.get('email'),
+        email=email,
         html=False,
         job_id=type.runner(run_config.get('report_id'))
     )
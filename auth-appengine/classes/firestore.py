@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
 from typing import Any, Dict, List, Optional
 
 from auth.credentials import Credentials
 from auth.datastore import secret_manager
+from google.api_core.exceptions import NotFound
 from google.cloud import bigquery, firestore
 from google.cloud.firestore import DocumentReference
 
@@ -48,12 +50,16 @@ class Firestore(object):
     self._project = project
     self._email = email
 
+  @decorators.lazy_property
+  def _credentials(self) -> Credentials:
+    return Credentials(email=self._email,
+                       datastore=secret_manager.SecretManager,
+                       project=self._project)
+
   @decorators.lazy_property
   def client(self):
     return firestore.Client() if self._in_cloud else \
-        firestore.Client(credentials=Credentials(
-            email=self._email, datastore=secret_manager.SecretManager,
-            project=self._project).get_credentials())
+        firestore.Client(credentials=self._credentials.get_credentials())
 
   def get_report_config(self, type: Type, id: str) -> Dict[str, Any]:
     """Loads a config
@@ -166,7 +172,7 @@ class Firestore(object):
     Arguments:
         runner {Dict[str, Any]} -- store a running report definition
     """
-    self.store_document(Type._RUNNING, runner)
+    self.store_document(Type._RUNNING, runner['report_id'], runner)
 
   def remove_report_runner(self, runner: str) -> None:
     """Removes a running report
@@ -213,11 +219,7 @@ class Firestore(object):
         id {str} -- report id
         report_data {Dict[str, Any]} -- report configuration
     """
-    report = self.client.document(f'{type}/{id}')
-    if report:
-      report.delete()
-
-    report.set(document)
+    self.client.document(f'{type}/{id}').set(document)
 
   def update_document(self, type: Type, id: str,
                       new_data: Dict[str, Any]) -> None:
@@ -254,7 +256,10 @@ class Firestore(object):
     if collection := self.client.collection(f'{type}'):
       if document_ref := collection.document(document_id=id):
         if key:
-          document_ref.update({key: firestore.DELETE_FIELD})
+          try:
+            document_ref.update({key: firestore.DELETE_FIELD})
+          except NotFound:
+            logging.info('%s/%s does not exist, nothing to remove.', type, id)
         else:
           document_ref.delete()
 